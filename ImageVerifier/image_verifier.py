@@ -1,75 +1,243 @@
 import os
-import customtkinter as ctk
-from tkinter import filedialog
+import sys
+import json
+import shutil
+import concurrent.futures
+import numpy as np
 from PIL import Image
 from ultralytics import YOLO
 from transformers import pipeline
 
 # --- INITIALIZE MODELS ---
 print("Loading Safety Engines... please wait.")
+MODEL_DIR = os.path.dirname(os.path.abspath(__file__))
+
 # Model 1: NSFW Detector
-safety_model = pipeline("image-classification", model="AdamCodd/vit-base-nsfw-detector")
+# The ViT is exported once to ONNX and quantized to INT8 (static QDQ when
+# NSFW_CALIB_DIR holds calibration images, dynamic otherwise), then served
+# through an ONNX Runtime CPU session. Falls back to the HF pipeline.
+SAFETY_MODEL_ID = "AdamCodd/vit-base-nsfw-detector"
+SAFETY_ONNX_DIR = os.path.join(MODEL_DIR, "vit_nsfw_onnx")
+SAFETY_INT8 = os.path.join(MODEL_DIR, "vit_nsfw_int8.onnx")
+
+class ONNXSafetyModel:
+    """INT8 ONNX Runtime session returning the same label/score list as the pipeline"""
+
+    def __init__(self, model_path):
+        import onnxruntime as ort
+        from transformers import AutoConfig, AutoImageProcessor
+        self.processor = AutoImageProcessor.from_pretrained(SAFETY_MODEL_ID)
+        self.labels = AutoConfig.from_pretrained(SAFETY_MODEL_ID).id2label
+        self.session = ort.InferenceSession(model_path, providers=["CPUExecutionProvider"])
+        self.input_name = self.session.get_inputs()[0].name
+
+    def __call__(self, image):
+        pixel_values = self.processor(images=image.convert("RGB"), return_tensors="np")["pixel_values"]
+        logits = self.session.run(None, {self.input_name: pixel_values})[0][0]
+        probs = np.exp(logits - logits.max())
+        probs = probs / probs.sum()
+        return [{"label": self.labels[i], "score": float(p)} for i, p in enumerate(probs)]
+
+def export_safety_model():
+    """Export and quantize the ViT; files only land at their final paths once complete"""
+    fp32_path = os.path.join(SAFETY_ONNX_DIR, "model.onnx")
+    tmp_dir = SAFETY_ONNX_DIR + ".tmp"
+    tmp_int8 = SAFETY_INT8 + ".tmp"
+    try:
+        # The FP32 export is staged in tmp_dir and renamed into place whole, so
+        # SAFETY_ONNX_DIR is never partial (a leftover one without model.onnx is
+        # cleared) and a failed quantization does not repeat the HF download
+        if not os.path.exists(fp32_path):
+            from optimum.onnxruntime import ORTModelForImageClassification
+            shutil.rmtree(SAFETY_ONNX_DIR, ignore_errors=True)
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+            ORTModelForImageClassification.from_pretrained(SAFETY_MODEL_ID, export=True).save_pretrained(tmp_dir)
+            os.replace(tmp_dir, SAFETY_ONNX_DIR)
+        quantize_safety_model(fp32_path, tmp_int8)
+        os.replace(tmp_int8, SAFETY_INT8)
+    except BaseException:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        if os.path.exists(tmp_int8):
+            os.remove(tmp_int8)
+        raise
+
+def quantize_safety_model(fp32_path, int8_path):
+    from onnxruntime.quantization import (
+        CalibrationDataReader, QuantFormat, QuantType, quantize_dynamic, quantize_static
+    )
+    from transformers import AutoImageProcessor
+
+    calib_dir = os.getenv("NSFW_CALIB_DIR")
+    if not calib_dir:
+        quantize_dynamic(fp32_path, int8_path, weight_type=QuantType.QInt8)
+        return
+
+    class ImageCalibrationReader(CalibrationDataReader):
+        def __init__(self, image_dir, limit=100):
+            processor = AutoImageProcessor.from_pretrained(SAFETY_MODEL_ID)
+            files = sorted(os.listdir(image_dir))[:limit]
+            self.batches = iter(
+                {"pixel_values": processor(images=Image.open(os.path.join(image_dir, f)).convert("RGB"),
+                                           return_tensors="np")["pixel_values"]}
+                for f in files
+            )
+
+        def get_next(self):
+            return next(self.batches, None)
+
+    quantize_static(fp32_path, int8_path, ImageCalibrationReader(calib_dir), quant_format=QuantFormat.QDQ)
+
+def load_safety_model():
+    try:
+        if not os.path.exists(SAFETY_INT8):
+            export_safety_model()
+        return ONNXSafetyModel(SAFETY_INT8)
+    except Exception as e:
+        print(f"ONNX safety model unavailable, using HF pipeline: {e}")
+        return pipeline("image-classification", model=SAFETY_MODEL_ID)
+
+safety_model = load_safety_model()
+
 # Model 2: Weapon Detector (YOLOv8)
-weapon_model = YOLO("yolov8n.pt")  # Initial download is ~6MB
-
-class ImageVerifierApp(ctk.CTk):
-    def __init__(self):
-        super().__init__()
-        
-        self.title("Startup Image Moderator & Weapon Detector")
-        self.geometry("600x500")
-        ctk.set_appearance_mode("dark")
-        
-        # UI Elements
-        self.label = ctk.CTkLabel(self, text="Image Verification System", font=("Arial", 24))
-        self.label.pack(pady=20)
-
-        self.btn_select = ctk.CTkButton(self, text="Select Image to Verify", command=self.verify_image)
-        self.btn_select.pack(pady=10)
-
-        self.result_text = ctk.CTkTextbox(self, width=500, height=200)
-        self.result_text.pack(pady=20)
-        self.result_text.insert("0.0", "Waiting for image...")
-
-    def verify_image(self):
-        file_path = filedialog.askopenfilename()
-        if not file_path:
-            return
-
-        self.result_text.delete("0.0", "end")
-        self.result_text.insert("0.0", f"Analyzing: {os.path.basename(file_path)}\n\n")
-        
+# On a CUDA machine the weights are exported once to a TensorRT FP16 engine
+# (set YOLO_INT8_CALIB to a dataset yaml for INT8) and the engine is reused.
+WEAPON_WEIGHTS = os.path.join(MODEL_DIR, "yolov8n.pt")
+WEAPON_ENGINE = os.path.join(MODEL_DIR, "yolov8n.engine")
+
+def load_weapon_model():
+    if not os.path.exists(WEAPON_ENGINE):
         try:
-            # --- STEP 1: Check for NSFW Content ---
-            safety_results = safety_model(Image.open(file_path))
-            nsfw_score = next(item['score'] for item in safety_results if item['label'] == 'nsfw')
-            
-            # --- STEP 2: Check for Weapons (COCO Classes: 43=knife, 0=person... we want 'firearm' categories) ---
-            # Using standard YOLOv8n, we check for 'knife' (class 43)
-            # For a dedicated 'Gun' detector, you'd load a specialized .pt file
-            weapon_results = weapon_model(file_path)[0]
-            detected_objects = [weapon_model.names[int(box.cls)] for box in weapon_results.boxes]
-            
-            # Specific weapon list
-            illegal_items = ["knife", "scissors", "gun", "pistol", "rifle"]
-            found_weapons = [item for item in detected_objects if item in illegal_items]
-
-            # --- STEP 3: Display Results ---
-            self.result_text.insert("end", f"Safety Score (NSFW): {round(nsfw_score * 100, 2)}%\n")
-            self.result_text.insert("end", f"Detected Objects: {', '.join(detected_objects) if detected_objects else 'None'}\n\n")
-
-            if nsfw_score > 0.4 or found_weapons:
-                self.result_text.insert("end", "VERDICT: [!] REJECTED\n", "red")
-                if found_weapons:
-                    self.result_text.insert("end", f"REASON: Weapon detected ({', '.join(found_weapons)})")
+            import torch
+            if torch.cuda.is_available():
+                calib = os.getenv("YOLO_INT8_CALIB")
+                export_args = {"int8": True, "data": calib} if calib else {"half": True}
+                YOLO(WEAPON_WEIGHTS).export(format="engine", device=0, imgsz=640, **export_args)
+        except Exception as e:
+            print(f"TensorRT export skipped, using PyTorch weights: {e}")
+    if os.path.exists(WEAPON_ENGINE):
+        return YOLO(WEAPON_ENGINE, task="detect")
+    return YOLO(WEAPON_WEIGHTS)  # Initial download is ~6MB
+
+weapon_model = load_weapon_model()
+
+# Object classes that count as weapons
+ILLEGAL_ITEMS = frozenset({"knife", "scissors", "gun", "pistol", "rifle"})
+
+# Class-id lookup tables so detections are mapped to names in one indexing op
+CLASS_NAMES = np.array([weapon_model.names[i] for i in range(len(weapon_model.names))])
+ILLEGAL_MASK = np.isin(CLASS_NAMES, list(ILLEGAL_ITEMS))
+
+# NSFW and YOLO inference run side by side on the model pool; in the GUI the
+# analysis job itself runs on a single worker so the Tk mainloop stays responsive.
+_model_pool = concurrent.futures.ThreadPoolExecutor(max_workers=2)
+_analysis_pool = concurrent.futures.ThreadPoolExecutor(max_workers=1)
+
+def analyze(file_path: str) -> dict:
+    """Run both safety checks on one image file and return the verdict as a dict"""
+    # Decode once and share it; ultralytics expects numpy input in BGR order
+    img = Image.open(file_path).convert("RGB")
+    img_bgr = np.ascontiguousarray(np.asarray(img)[..., ::-1])
+
+    # --- STEP 1: Check for NSFW Content ---
+    f_safety = _model_pool.submit(safety_model, img)
+
+    # --- STEP 2: Check for Weapons (COCO Classes: 43=knife, 0=person... we want 'firearm' categories) ---
+    # Using standard YOLOv8n, we check for 'knife' (class 43)
+    # For a dedicated 'Gun' detector, you'd load a specialized .pt file
+    f_weapon = _model_pool.submit(weapon_model, img_bgr, verbose=False)
+
+    safety_results, weapon_results = f_safety.result(), f_weapon.result()[0]
+    nsfw_score = next(item['score'] for item in safety_results if item['label'] == 'nsfw')
+    cls_ids = weapon_results.boxes.cls.cpu().numpy().astype(np.intp)  # one device sync + copy
+    detected_objects = CLASS_NAMES[cls_ids].tolist()
+    found_weapons = CLASS_NAMES[cls_ids[ILLEGAL_MASK[cls_ids]]].tolist()
+
+    if found_weapons:
+        verdict, reason = "REJECTED", f"Weapon detected ({', '.join(found_weapons)})"
+    elif nsfw_score > 0.4:
+        verdict, reason = "REJECTED", "Inappropriate content."
+    else:
+        verdict, reason = "APPROVED", None
+
+    return {
+        "nsfw_score": float(nsfw_score),
+        "detected": detected_objects,
+        "found_weapons": found_weapons,
+        "verdict": verdict,
+        "reason": reason,
+    }
+
+def create_app():
+    """Build the Tk GUI; customtkinter is only imported when a window is wanted"""
+    import customtkinter as ctk
+    from tkinter import filedialog
+
+    class ImageVerifierApp(ctk.CTk):
+        def __init__(self):
+            super().__init__()
+
+            self.title("Startup Image Moderator & Weapon Detector")
+            self.geometry("600x500")
+            ctk.set_appearance_mode("dark")
+
+            # UI Elements
+            self.label = ctk.CTkLabel(self, text="Image Verification System", font=("Arial", 24))
+            self.label.pack(pady=20)
+
+            self.btn_select = ctk.CTkButton(self, text="Select Image to Verify", command=self.verify_image)
+            self.btn_select.pack(pady=10)
+
+            self.result_text = ctk.CTkTextbox(self, width=500, height=200)
+            self.result_text.pack(pady=20)
+            self.result_text.insert("0.0", "Waiting for image...")
+
+        def verify_image(self):
+            file_path = filedialog.askopenfilename()
+            if not file_path:
+                return
+
+            self.result_text.delete("0.0", "end")
+            self.result_text.insert("0.0", f"Analyzing: {os.path.basename(file_path)}\n\n")
+            _analysis_pool.submit(self.analyze_image, file_path)
+
+        def analyze_image(self, file_path):
+            output = []
+            try:
+                result = analyze(file_path)
+
+                # --- STEP 3: Display Results ---
+                detected = result["detected"]
+                output.append((f"Safety Score (NSFW): {round(result['nsfw_score'] * 100, 2)}%\n",))
+                output.append((f"Detected Objects: {', '.join(detected) if detected else 'None'}\n\n",))
+
+                if result["verdict"] == "REJECTED":
+                    output.append(("VERDICT: [!] REJECTED\n", "red"))
+                    output.append((f"REASON: {result['reason']}",))
                 else:
-                    self.result_text.insert("end", "REASON: Inappropriate content.")
-            else:
-                self.result_text.insert("end", "VERDICT: [✓] APPROVED\n", "green")
+                    output.append(("VERDICT: [✓] APPROVED\n", "green"))
 
-        except Exception as e:
-            self.result_text.insert("end", f"Error analyzing image: {e}")
+            except Exception as e:
+                output.append((f"Error analyzing image: {e}",))
+
+            # Tk widgets may only be touched from the main thread
+            self.after(0, self.show_results, output)
+
+        def show_results(self, output):
+            for args in output:
+                self.result_text.insert("end", *args)
+
+    return ImageVerifierApp()
 
 if __name__ == "__main__":
-    app = ImageVerifierApp()
-    app.mainloop()
\ No newline at end of file
+    if "--cli" in sys.argv:
+        # Headless batch mode: one JSON line per image, no Tk import
+        for path in (arg for arg in sys.argv[1:] if arg != "--cli"):
+            try:
+                result = {"path": path, **analyze(path)}
+            except Exception as e:
+                result = {"path": path, "error": str(e)}
+            json.dump(result, sys.stdout)
+            sys.stdout.write("\n")
+    else:
+        app = create_app()
+        app.mainloop()
@@ -2,9 +2,13 @@
 Content Verification API
 """
 
-import os
+import time
+import logging
+import threading
+from functools import cached_property
+from operator import itemgetter
+from concurrent.futures import ThreadPoolExecutor
 from typing import Dict, List, Optional
-from datetime import datetime
 
 from inference.text_classifier import TextClassifier
 from inference.image_classifier import ImageClassifier
@@ -12,15 +16,61 @@ from inference.fusion import FusionClassifier
 from policy.decision_engine import DecisionEngine
 from database.business_profiles import BusinessProfileDB
 
+logger = logging.getLogger(__name__)
+
+# Runs image inference alongside text inference for mixed requests
+_image_pool = ThreadPoolExecutor(max_workers=4)
+
+# (second, formatted prefix) of the last timestamp produced
+_timestamp_cache = (None, '')
+
+def _now_iso() -> str:
+    """Local ISO-8601 timestamp, reusing the formatted date/time within the same second"""
+    global _timestamp_cache
+    now = time.time()
+    second = int(now)
+    cached_second, prefix = _timestamp_cache
+    if cached_second != second:
+        prefix = time.strftime('%Y-%m-%dT%H:%M:%S', time.localtime(second))
+        _timestamp_cache = (second, prefix)
+    return f"{prefix}.{int((now - second) * 1e6):06d}"
+
 class ContentVerificationAPI:
     """Main API class for content verification"""
     
     def __init__(self):
-        self.text_classifier = TextClassifier()
-        self.image_classifier = ImageClassifier()
-        self.fusion_classifier = FusionClassifier()
-        self.decision_engine = DecisionEngine()
-        self.business_db = BusinessProfileDB()
+        # Components are built on first use so e.g. text-only callers never load the image model
+        self._init_lock = threading.RLock()
+        # Upper bound on threads used by batch_verify
+        self.batch_workers = 32
+    
+    def _build_component(self, name: str, factory):
+        """Construct a component once, even when first requested from several threads"""
+        with self._init_lock:
+            if name not in self.__dict__:
+                logger.info(f"Initializing {name.replace('_', ' ')}...")
+                self.__dict__[name] = factory()
+            return self.__dict__[name]
+    
+    @cached_property
+    def text_classifier(self) -> TextClassifier:
+        return self._build_component('text_classifier', TextClassifier)
+    
+    @cached_property
+    def image_classifier(self) -> ImageClassifier:
+        return self._build_component('image_classifier', ImageClassifier)
+    
+    @cached_property
+    def fusion_classifier(self) -> FusionClassifier:
+        return self._build_component('fusion_classifier', FusionClassifier)
+    
+    @cached_property
+    def decision_engine(self) -> DecisionEngine:
+        return self._build_component('decision_engine', DecisionEngine)
+    
+    @cached_property
+    def business_db(self) -> BusinessProfileDB:
+        return self._build_component('business_db', BusinessProfileDB)
     
     def verify_text(self, text: str, title: str = "", business_profile: Optional[Dict] = None) -> Dict:
         """Verify text content"""
@@ -38,7 +88,7 @@ class ContentVerificationAPI:
                 "content_type": "text",
                 "prediction": prediction,
                 "decision": decision,
-                "timestamp": datetime.now().isoformat(),
+                "timestamp": _now_iso(),
                 "business_context": business_profile is not None
             }
             
@@ -46,7 +96,7 @@ class ContentVerificationAPI:
             return {
                 "error": str(e),
                 "content_type": "text",
-                "timestamp": datetime.now().isoformat()
+                "timestamp": _now_iso()
             }
     
     def verify_image(self, image_path: str, business_profile: Optional[Dict] = None) -> Dict:
@@ -62,7 +112,7 @@ class ContentVerificationAPI:
                 "content_type": "image",
                 "prediction": prediction,
                 "decision": decision,
-                "timestamp": datetime.now().isoformat(),
+                "timestamp": _now_iso(),
                 "business_context": business_profile is not None
             }
             
@@ -70,69 +120,170 @@ class ContentVerificationAPI:
             return {
                 "error": str(e),
                 "content_type": "image",
-                "timestamp": datetime.now().isoformat()
+                "timestamp": _now_iso()
             }
     
+    def verify_images(self, image_paths: List[str],
+                      business_profiles: Optional[List[Optional[Dict]]] = None) -> List[Dict]:
+        """Verify several independent images with one batched forward pass (results match verify_image)"""
+        business_profiles = business_profiles or [None] * len(image_paths)
+        try:
+            predictions = self.image_classifier.predict_from_paths(image_paths)
+        except Exception as e:
+            timestamp = _now_iso()
+            return [{
+                "error": str(e),
+                "content_type": "image",
+                "timestamp": timestamp
+            } for _ in image_paths]
+        
+        timestamp = _now_iso()
+        results = []
+        for prediction, business_profile in zip(predictions, business_profiles):
+            try:
+                decision = self.decision_engine.make_decision(prediction, business_profile)
+                results.append({
+                    "content_type": "image",
+                    "prediction": prediction,
+                    "decision": decision,
+                    "timestamp": timestamp,
+                    "business_context": business_profile is not None
+                })
+            except Exception as e:
+                results.append({
+                    "error": str(e),
+                    "content_type": "image",
+                    "timestamp": timestamp
+                })
+        return results
+    
     def verify_mixed(self, text: str, title: str = "", image_paths: List[str] = None, 
                      business_profile: Optional[Dict] = None) -> Dict:
         """Verify mixed content (text + images)"""
         try:
             image_paths = image_paths or []
             
-            # Get text prediction
-            text_prediction = None
-            if text or title:
-                full_text = f"{title} {text}" if title else text
-                text_prediction = self.text_classifier.predict(full_text)
-            
-            # Get image predictions
+            # Get image predictions in one batched pass (missing files are skipped)
+            # on the image pool while the text is classified on this thread; text-only
+            # requests never touch (and so never load) the image classifier
+            image_future = None
+            if image_paths:
+                image_future = _image_pool.submit(self.image_classifier.predict_from_paths, image_paths, True)
+            text_prediction = self._predict_text(text, title)
             image_predictions = []
-            for img_path in image_paths:
-                if os.path.exists(img_path):
-                    img_pred = self.image_classifier.predict_from_path(img_path)
-                    image_predictions.append(img_pred)
-            
-            # Fuse predictions
-            if text_prediction and image_predictions:
-                prediction = self.fusion_classifier.fuse_predictions(text_prediction, image_predictions)
-                prediction["source"] = "fusion"
-            elif text_prediction:
-                prediction = text_prediction
-                prediction["source"] = "text_only"
-            elif image_predictions:
-                # Use highest confidence image
-                prediction = max(image_predictions, key=lambda x: x.get('confidence', 0))
-                prediction["source"] = "image_only"
-            else:
-                prediction = {
-                    "category": "unknown",
-                    "confidence": 0.0,
-                    "is_restricted": False
-                }
-                prediction["source"] = "none"
+            if image_future is not None:
+                image_predictions = [p for p in image_future.result() if p is not None]
             
-            # Make decision
-            decision = self.decision_engine.make_decision(prediction, business_profile)
-            
-            return {
-                "content_type": "mixed",
-                "prediction": prediction,
-                "decision": decision,
-                "timestamp": datetime.now().isoformat(),
-                "business_context": business_profile is not None,
-                "components": {
-                    "has_text": bool(text or title),
-                    "has_images": bool(image_paths),
-                    "image_count": len(image_paths)
-                }
-            }
+            return self._build_mixed_result(text, title, image_paths, image_predictions, business_profile,
+                                            text_prediction=text_prediction)
             
         except Exception as e:
             return {
                 "error": str(e),
                 "content_type": "mixed",
-                "timestamp": datetime.now().isoformat()
+                "timestamp": _now_iso()
+            }
+    
+    def verify_for_business(self, text: str = "", title: str = "", image_paths: List[str] = None,
+                            business_profile: Optional[Dict] = None) -> Dict:
+        """Verify content against a business profile, routing to the matching content type"""
+        if image_paths and (text or title):
+            return self.verify_mixed(text, title, image_paths, business_profile)
+        if image_paths and len(image_paths) == 1:
+            return self.verify_image(image_paths[0], business_profile)
+        if image_paths:
+            return self.verify_mixed("", "", image_paths, business_profile)
+        return self.verify_text(text, title, business_profile)
+    
+    def batch_verify(self, requests: List[Dict]) -> List[Dict]:
+        """Verify multiple mixed content requests, batching all images into one pass"""
+        if not requests:
+            return []
+        
+        # Flatten image paths across requests, remembering each request's slice
+        flat_paths = []
+        offsets = []
+        for request in requests:
+            paths = request.get('image_paths') or []
+            offsets.append((len(flat_paths), len(flat_paths) + len(paths)))
+            flat_paths.extend(paths)
+        
+        all_predictions = self.image_classifier.predict_from_paths(flat_paths, missing_ok=True)
+        profiles = self.business_db.get_profiles(
+            request['business_id'] for request in requests if request.get('business_id')
+        )
+        timestamp = _now_iso()
+        
+        def process(request: Dict, start: int, end: int) -> Dict:
+            try:
+                return self._build_mixed_result(
+                    request.get('text', ''),
+                    request.get('title', ''),
+                    request.get('image_paths') or [],
+                    [p for p in all_predictions[start:end] if p is not None],
+                    profiles.get(request.get('business_id')),
+                    timestamp
+                )
+            except Exception as e:
+                return {
+                    "error": str(e),
+                    "content_type": "mixed",
+                    "timestamp": timestamp
+                }
+        
+        # Fuse and decide per request on a bounded pool; map keeps request order
+        with ThreadPoolExecutor(max_workers=min(self.batch_workers, len(requests))) as pool:
+            return list(pool.map(process, requests, *zip(*offsets)))
+    
+    def _build_mixed_result(self, text: str, title: str, image_paths: List[str],
+                            image_predictions: List[Dict], business_profile: Optional[Dict],
+                            timestamp: Optional[str] = None, text_prediction: Optional[Dict] = None) -> Dict:
+        """Fuse text and precomputed image predictions and make a decision"""
+        # Get text prediction unless the caller already has it
+        if text_prediction is None:
+            text_prediction = self._predict_text(text, title)
+        
+        # Fuse predictions
+        if text_prediction and image_predictions:
+            prediction = self.fusion_classifier.fuse_predictions(text_prediction, image_predictions)
+            prediction["source"] = "fusion"
+        elif text_prediction:
+            prediction = text_prediction
+            prediction["source"] = "text_only"
+        elif image_predictions:
+            # Use highest confidence image
+            prediction = max(image_predictions, key=itemgetter('confidence'))
+            prediction["source"] = "image_only"
+        else:
+            prediction = {
+                "category": "unknown",
+                "confidence": 0.0,
+                "is_restricted": False
             }
+            prediction["source"] = "none"
+        
+        # Make decision
+        decision = self.decision_engine.make_decision(prediction, business_profile)
+        
+        return {
+            "content_type": "mixed",
+            "prediction": prediction,
+            "decision": decision,
+            "timestamp": timestamp or _now_iso(),
+            "business_context": business_profile is not None,
+            "components": {
+                "has_text": bool(text or title),
+                "has_images": bool(image_paths),
+                "image_count": len(image_paths)
+            }
+        }
+    
+    def _predict_text(self, text: str, title: str) -> Optional[Dict]:
+        """Text prediction for title + text, or None when both are empty"""
+        if not (text or title):
+            return None
+        full_text = f"{title} {text}" if title else text
+        return self.text_classifier.predict(full_text)
     
     def get_categories(self) -> Dict:
         """Get available categories"""
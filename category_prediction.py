@@ -4,21 +4,13 @@ Handles both text and image content classification
 """
 
 import os
-import sys
 import json
 import logging
-from typing import Dict, List, Tuple, Optional, Any
-import numpy as np
-from PIL import Image
-import torch
-import torchvision.transforms as transforms
+import threading
+from functools import cached_property
+from typing import Dict, List, Optional, Any
 
-# Add the service directory to path
-sys.path.append(os.path.join(os.path.dirname(__file__), 'content-verification-service'))
-
-from api.verify_content import ContentVerificationAPI
 from inference.text_classifier import TextClassifier
-from inference.image_classifier import ImageClassifier
 from inference.fusion import FusionClassifier
 from policy.decision_engine import DecisionEngine
 
@@ -42,25 +34,39 @@ class CategoryPredictor:
             config_path: Path to configuration file
         """
         self.config = self._load_config(config_path)
+        self._restricted = self.config['restricted_categories']
         
-        # Initialize classifiers
-        logger.info("Initializing text classifier...")
-        self.text_classifier = TextClassifier()
-        
-        logger.info("Initializing image classifier...")
-        self.image_classifier = ImageClassifier()
-        
-        logger.info("Initializing fusion classifier...")
-        self.fusion_classifier = FusionClassifier(
-            text_classifier=self.text_classifier,
-            image_classifier=self.image_classifier
-        )
-        
-        logger.info("Initializing decision engine...")
-        self.decision_engine = DecisionEngine()
+        # Classifiers are built on first use so text-only callers never load the image model
+        self._init_lock = threading.RLock()
         
         logger.info("CategoryPredictor initialized successfully")
     
+    def _build_component(self, name: str, factory):
+        """Construct a component once, even when first requested from several threads"""
+        with self._init_lock:
+            if name not in self.__dict__:
+                logger.info(f"Initializing {name.replace('_', ' ')}...")
+                self.__dict__[name] = factory()
+            return self.__dict__[name]
+    
+    @cached_property
+    def text_classifier(self) -> TextClassifier:
+        return self._build_component('text_classifier', TextClassifier)
+    
+    @cached_property
+    def image_classifier(self) -> "ImageClassifier":
+        # Imported here so text-only use and the CLI never load the image stack
+        from inference.image_classifier import ImageClassifier
+        return self._build_component('image_classifier', ImageClassifier)
+    
+    @cached_property
+    def fusion_classifier(self) -> FusionClassifier:
+        return self._build_component('fusion_classifier', FusionClassifier)
+    
+    @cached_property
+    def decision_engine(self) -> DecisionEngine:
+        return self._build_component('decision_engine', DecisionEngine)
+    
     def _load_config(self, config_path: str = None) -> Dict:
         """Load configuration from file or use defaults"""
         default_config = {
@@ -80,7 +86,8 @@ class CategoryPredictor:
             'fusion_weights': {
                 'text': 0.6,
                 'image': 0.4
-            }
+            },
+            'image_batch_size': 16
         }
         
         if config_path and os.path.exists(config_path):
@@ -93,6 +100,9 @@ class CategoryPredictor:
             except Exception as e:
                 logger.error(f"Failed to load config from {config_path}: {e}")
         
+        # Membership is checked on every prediction
+        default_config['restricted_categories'] = frozenset(default_config['restricted_categories'])
+        
         return default_config
     
     def predict_text(self, text: str, title: str = "") -> Dict:
@@ -114,34 +124,28 @@ class CategoryPredictor:
             
             # Get prediction from text classifier
             text_prediction = self.text_classifier.predict(combined_text)
+            return self._finalize_prediction(text_prediction, 'text')
             
-            # Check against restricted categories
-            is_restricted = text_prediction['category'] in self.config['restricted_categories']
-            
-            result = {
-                'content_type': 'text',
-                'predicted_category': text_prediction['category'],
-                'confidence': float(text_prediction['confidence']),
-                'is_restricted': is_restricted,
-                'top_categories': text_prediction.get('top_categories', []),
-                'features': text_prediction.get('features', {}),
-                'model_used': 'text_classifier'
-            }
-            
-            logger.info(f"Text prediction: {text_prediction['category']} "
-                       f"(confidence: {text_prediction['confidence']:.2f})")
-            
-            return result
+        except Exception as e:
+            logger.error(f"Error in text prediction: {e}")
+            return self._error_result('text', str(e))
+    
+    def predict_texts(self, texts: List[str]) -> List[Dict]:
+        """
+        Predict categories for several texts in one classifier call
+        
+        Args:
+            texts: List of texts (title already combined where wanted)
             
+        Returns:
+            One prediction result per text
+        """
+        try:
+            predictions = self.text_classifier.predict_batch(texts)
         except Exception as e:
             logger.error(f"Error in text prediction: {e}")
-            return {
-                'content_type': 'text',
-                'predicted_category': 'unknown',
-                'confidence': 0.0,
-                'is_restricted': False,
-                'error': str(e)
-            }
+            return [self._error_result('text', str(e)) for _ in texts]
+        return [self._finalize_prediction(prediction, 'text') for prediction in predictions]
     
     def predict_image(self, image_path: str) -> Dict:
         """
@@ -153,48 +157,73 @@ class CategoryPredictor:
         Returns:
             Dictionary with prediction results
         """
-        try:
-            logger.info(f"Predicting category for image: {image_path}")
-            
-            # Check if image exists
-            if not os.path.exists(image_path):
-                raise FileNotFoundError(f"Image not found: {image_path}")
-            
-            # Load and preprocess image
-            image = Image.open(image_path).convert('RGB')
-            
-            # Get prediction from image classifier
-            image_prediction = self.image_classifier.predict(image)
-            
-            # Check against restricted categories
-            is_restricted = image_prediction['category'] in self.config['restricted_categories']
-            
-            result = {
-                'content_type': 'image',
-                'predicted_category': image_prediction['category'],
-                'confidence': float(image_prediction['confidence']),
-                'is_restricted': is_restricted,
-                'top_categories': image_prediction.get('top_categories', []),
-                'features': image_prediction.get('features', {}),
-                'model_used': 'image_classifier'
-            }
-            
-            logger.info(f"Image prediction: {image_prediction['category']} "
-                       f"(confidence: {image_prediction['confidence']:.2f})")
-            
-            return result
+        logger.info(f"Predicting category for image: {image_path}")
+        result = self.predict_images([image_path])[0]
+        return result if result is not None else self._error_result('image', f"Image not found: {image_path}")
+    
+    def predict_images(self, image_paths: List[str]) -> List[Optional[Dict]]:
+        """
+        Predict categories for several images with batched forward passes
+        
+        Args:
+            image_paths: List of image file paths
             
-        except Exception as e:
-            logger.error(f"Error in image prediction: {e}")
-            return {
-                'content_type': 'image',
-                'predicted_category': 'unknown',
-                'confidence': 0.0,
-                'is_restricted': False,
-                'error': str(e)
-            }
+        Returns:
+            One prediction result per path, None for files that do not exist
+        """
+        results = []
+        batch_size = self.config['image_batch_size']
+        for start in range(0, len(image_paths), batch_size):
+            try:
+                predictions = self.image_classifier.predict_from_paths(
+                    image_paths[start:start + batch_size], missing_ok=True
+                )
+            except Exception as e:
+                logger.error(f"Error in image prediction: {e}")
+                results.extend(self._error_result('image', str(e)) for _ in image_paths[start:start + batch_size])
+                continue
+            
+            for image_prediction in predictions:
+                if image_prediction is None:
+                    results.append(None)
+                elif 'error' in image_prediction:
+                    logger.error(f"Error in image prediction: {image_prediction['error']}")
+                    results.append(self._error_result('image', image_prediction['error']))
+                else:
+                    results.append(self._finalize_prediction(image_prediction, 'image'))
+        
+        return results
     
-    def predict_mixed(self, text: str, image_paths: List[str], title: str = "") -> Dict:
+    def _finalize_prediction(self, prediction: Dict, content_type: str) -> Dict:
+        """Build the result dict for a text or image classifier prediction"""
+        result = {
+            'content_type': content_type,
+            'predicted_category': prediction['category'],
+            'confidence': float(prediction['confidence']),
+            'is_restricted': prediction['category'] in self._restricted,
+            'top_categories': prediction.get('top_categories', []),
+            'features': prediction.get('features', {}),
+            'model_used': f'{content_type}_classifier'
+        }
+        
+        logger.info(f"{content_type.capitalize()} prediction: {prediction['category']} "
+                   f"(confidence: {prediction['confidence']:.2f})")
+        
+        return result
+    
+    def _error_result(self, content_type: str, error: str) -> Dict:
+        """Result dict for content that could not be classified"""
+        return {
+            'content_type': content_type,
+            'predicted_category': 'unknown',
+            'confidence': 0.0,
+            'is_restricted': False,
+            'error': error
+        }
+    
+    def predict_mixed(self, text: str, image_paths: List[str], title: str = "",
+                      image_results: Optional[List[Dict]] = None,
+                      text_result: Optional[Dict] = None) -> Dict:
         """
         Predict category for mixed content (text + images)
         
@@ -202,6 +231,8 @@ class CategoryPredictor:
             text: Main content text
             image_paths: List of image file paths
             title: Optional title
+            image_results: Precomputed image predictions for image_paths (skips inference)
+            text_result: Precomputed text prediction (skips inference)
             
         Returns:
             Dictionary with prediction results
@@ -210,14 +241,12 @@ class CategoryPredictor:
             logger.info(f"Predicting category for mixed content with {len(image_paths)} images")
             
             # Get text prediction
-            text_result = self.predict_text(text, title) if text else None
+            if text_result is None and text:
+                text_result = self.predict_text(text, title)
             
-            # Get image predictions
-            image_results = []
-            for img_path in image_paths:
-                if os.path.exists(img_path):
-                    img_result = self.predict_image(img_path)
-                    image_results.append(img_result)
+            # Get image predictions in batches; missing files are skipped
+            if image_results is None:
+                image_results = [r for r in self.predict_images(image_paths) if r is not None]
             
             # Fuse predictions if we have both text and images
             if text_result and image_results:
@@ -354,18 +383,33 @@ class CategoryPredictor:
         Returns:
             List of prediction results
         """
-        results = []
+        # Run every image across all contents through batched inference up front
+        content_paths = []
         for content in contents:
+            image_paths = content.get('image_paths', [])
+            # Image-only contents are classified by their first image
+            content_paths.append(image_paths if content.get('text', '') else image_paths[:1])
+        all_image_results = iter(self.predict_images([p for paths in content_paths for p in paths]))
+        
+        # Likewise classify every text in a single call
+        texts = [content.get('text', '') for content in contents]
+        all_text_results = iter(self.predict_texts([text for text in texts if text]))
+        
+        results = []
+        for text, image_paths in zip(texts, content_paths):
+            image_results = [next(all_image_results) for _ in image_paths]
+            text_result = next(all_text_results) if text else None
             try:
-                text = content.get('text', '')
-                image_paths = content.get('image_paths', [])
-                
                 if text and image_paths:
-                    result = self.predict_mixed(text, image_paths)
+                    result = self.predict_mixed(
+                        text, image_paths,
+                        image_results=[r for r in image_results if r is not None],
+                        text_result=text_result
+                    )
                 elif text:
-                    result = self.predict_text(text)
+                    result = text_result
                 elif image_paths:
-                    result = self.predict_image(image_paths[0])
+                    result = image_results[0] or self._error_result('image', f"Image not found: {image_paths[0]}")
                 else:
                     result = {'error': 'No content provided'}
                 
@@ -377,6 +421,20 @@ class CategoryPredictor:
         
         return results
 
+# Process-wide predictors shared by callers such as web handlers, one per config_path
+_predictors = {}
+_predictor_lock = threading.Lock()
+
+def get_predictor(config_path: str = None) -> CategoryPredictor:
+    """Return the shared CategoryPredictor for config_path, creating it on first call"""
+    predictor = _predictors.get(config_path)
+    if predictor is None:
+        with _predictor_lock:
+            predictor = _predictors.get(config_path)
+            if predictor is None:
+                predictor = _predictors[config_path] = CategoryPredictor(config_path=config_path)
+    return predictor
+
 
 def main():
     """Main function for command-line usage"""
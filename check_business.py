@@ -8,10 +8,16 @@ with open('data/business_profiles.json') as f:
 print('B053 profile:', data.get('B053', 'NOT FOUND'))
 print()
 
+# Index businesses by domain once so per-domain lookups are O(1)
+domain_to_bids = {}
+for bid, binfo in data.items():
+    for domain in binfo.get('domains', []):
+        domain_to_bids.setdefault(domain, set()).add(bid)
+
 # Find education businesses
-edu_biz = [bid for bid, binfo in data.items() if 'education' in binfo.get('domains', [])]
+edu_biz = sorted(domain_to_bids.get('education', ()))
 print(f'Education businesses ({len(edu_biz)}):')
-for bid in sorted(edu_biz)[:10]:
+for bid in edu_biz[:10]:
     print(f'  {bid}: {data[bid]["domains"]}')
 
 print()
@@ -20,18 +26,29 @@ print()
 df = pd.read_csv('data/content_verification_dataset.csv')
 print(f'Total samples: {len(df)}')
 
+# Per-business / per-category sample counts in a single pass
+# (categorical dtypes let the groupby work on integer codes)
+df['business_id'] = df['business_id'].astype('category')
+df['category'] = df['category'].astype('category')
+counts = df.groupby(['business_id', 'category'], observed=True).size().unstack(fill_value=0)
+
+def category_counts(bid):
+    """Non-zero category counts for one business, largest first"""
+    if bid not in counts.index:
+        return pd.Series(dtype='int64')
+    row = counts.loc[bid]
+    return row[row > 0].sort_values(ascending=False)
+
 # Show M001 samples by category
 print('\nM001 samples by category:')
-m001_cats = df[df['business_id'] == 'M001'].groupby('category').size().sort_values(ascending=False)
-print(m001_cats)
+print(category_counts('M001'))
 
 # Verify M001 never has education
-m001_edu = df[(df['business_id'] == 'M001') & (df['category'] == 'education')]
-print(f'\nM001 with education category: {len(m001_edu)} (should be 0)')
+m001_edu = category_counts('M001').get('education', 0)
+print(f'\nM001 with education category: {m001_edu} (should be 0)')
 
 # Check first education business
 edu_bid = edu_biz[0] if edu_biz else None
 if edu_bid:
     print(f'\n{edu_bid} samples by category:')
-    edu_df = df[df['business_id'] == edu_bid]
-    print(edu_df['category'].value_counts())
+    print(category_counts(edu_bid))
@@ -1,20 +1,34 @@
 import os
+import re
 import json
+import asyncio
 import google.generativeai as genai
 from dotenv import load_dotenv
 
+try:
+    from orjson import loads as json_loads
+except ImportError:  # optional; stdlib parser otherwise
+    json_loads = json.loads
+
 load_dotenv()
 
+# Markdown code fence (optionally tagged json) around the model's JSON answer
+FENCE_RE = re.compile(r'^\s*```(?:json)?\s*|\s*```\s*$')
+
 API_KEY = os.getenv("GEMINI_API_KEY")
+# Seconds to wait for Gemini before giving up on a request
+GEMINI_TIMEOUT = 10.0
+
+# Created once so the SDK client and its connections are reused across requests
+model = None
 if API_KEY:
     genai.configure(api_key=API_KEY)
+    model = genai.GenerativeModel('gemini-flash-latest')
 
-def analyze_content(user_text: str, registered_domain: str) -> dict:
+async def analyze_content(user_text: str, registered_domain: str) -> dict:
     if not API_KEY:
         raise ValueError("Gemini API Key is missing in environment variables.")
 
-    model = genai.GenerativeModel('gemini-flash-latest')
-
     prompt = f"""
     Role: You are the "Venture Content Guard," a high-precision content moderation AI for a professional startup platform.
 
@@ -44,16 +58,12 @@ def analyze_content(user_text: str, registered_domain: str) -> dict:
     """
 
     try:
-        response = model.generate_content(prompt)
-        text_response = response.text.strip()
-        
+        # Awaited, so the event loop keeps serving other requests meanwhile
+        response = await asyncio.wait_for(model.generate_content_async(prompt), timeout=GEMINI_TIMEOUT)
         # Clean up code blocks
-        if text_response.startswith("```json"):
-            text_response = text_response.replace("```json", "").replace("```", "").strip()
-        elif text_response.startswith("```"):
-             text_response = text_response.replace("```", "").strip()
+        text_response = FENCE_RE.sub('', response.text).strip()
         
-        data = json.loads(text_response)
+        data = json_loads(text_response)
         
         # Logic check for confidence
         try:
@@ -65,6 +75,8 @@ def analyze_content(user_text: str, registered_domain: str) -> dict:
             
         return data
         
+    except asyncio.TimeoutError:
+        raise RuntimeError(f"Gemini API Error: no response within {GEMINI_TIMEOUT:.0f}s")
     except Exception as e:
         # Re-raise the exception to be handled by the API layer
         raise RuntimeError(f"Gemini API Error: {str(e)}")
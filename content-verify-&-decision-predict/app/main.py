@@ -1,21 +1,38 @@
+import logging
+from typing import List
 from fastapi import FastAPI, HTTPException
-from app.models import AnalysisRequest, AnalysisResponse
-from app.trained_model_analyzer import analyze_content
+from fastapi.concurrency import run_in_threadpool
+from app.models import AnalysisRequest, AnalysisResponse, BatchAnalysisRequest
+from app.trained_model_analyzer import analyze_content, analyze_contents, get_analyzer
 import uvicorn
 
+logger = logging.getLogger(__name__)
+
 app = FastAPI(
     title="Venture Content Guard",
     description="A high-precision content moderation API for a professional startup platform.",
     version="1.0.0"
 )
 
+@app.on_event("startup")
+def load_models():
+    """Load the trained models before the first request arrives"""
+    try:
+        get_analyzer()
+    except Exception as e:
+        # analyze_content retries the load and reports the error per request
+        logger.error(f"Could not preload models: {e}")
+
 @app.post("/analyze", response_model=AnalysisResponse, status_code=200)
 async def analyze_post(request: AnalysisRequest):
     """
     Analyze incoming text posts for domain alignment and professionalism.
     """
     try:
-        result = analyze_content(request.user_text, request.registered_domain, request.business_id)
+        # CPU-bound model inference; keep it off the event loop
+        result = await run_in_threadpool(
+            analyze_content, request.user_text, request.registered_domain, request.business_id
+        )
         return result
         
     except ValueError as e:
@@ -31,5 +48,17 @@ async def analyze_post(request: AnalysisRequest):
         # Catch-all for unexpected errors
         raise HTTPException(status_code=500, detail=f"Internal Server Error: {str(e)}")
 
+@app.post("/analyze_batch", response_model=List[AnalysisResponse], status_code=200)
+async def analyze_batch(request: BatchAnalysisRequest):
+    """
+    Analyze several posts with one vectorizer call and one model call per model.
+    Results are returned in request order.
+    """
+    items = [item.model_dump() for item in request.items]
+    try:
+        return await run_in_threadpool(analyze_contents, items)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Internal Server Error: {str(e)}")
+
 if __name__ == "__main__":
     uvicorn.run("app.main:app", host="0.0.0.0", port=8000, reload=True)
@@ -1,5 +1,5 @@
 from pydantic import BaseModel, Field
-from typing import Optional
+from typing import List, Optional
 
 class AnalysisRequest(BaseModel):
     user_text: str = Field(..., alias="User_Text", description="The content the user wants to post.")
@@ -9,6 +9,9 @@ class AnalysisRequest(BaseModel):
     class Config:
         populate_by_name = True
 
+class BatchAnalysisRequest(BaseModel):
+    items: List[AnalysisRequest] = Field(..., description="Posts to analyze in one pass.")
+
 class AnalysisResponse(BaseModel):
     status: str = Field(..., description="Approved / Rejected / Flagged for Manual Review")
     reason: str = Field(..., description="Brief explanation of why it was blocked or allowed")
@@ -6,18 +6,65 @@ Uses trained ML models instead of Gemini API
 import os
 import sys
 import json
+import atexit
 import pickle
+import shelve
+import hashlib
 import numpy as np
 import logging
-from typing import Dict
+import threading
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
 
 # Add parent directory to path for imports
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..'))
 
 from data.text_preprocessor import TextPreprocessor
+from data.text_vectorizer import TextVectorizer
+
+try:
+    import onnxruntime as ort
+except ImportError:  # optional; the pickled scikit-learn models are used instead
+    ort = None
 
 logger = logging.getLogger(__name__)
 
+# Threads per model call (forest n_jobs / onnxruntime intra-op threads). The API
+# already serves requests concurrently, so 1 avoids oversubscribing the cores;
+# raise it for batch jobs or hosts with spare cores per worker
+try:
+    INFERENCE_THREADS = max(1, int(os.getenv("INFERENCE_THREADS", 1)))
+except ValueError:  # malformed setting; keep the default rather than fail at import
+    logger.warning("Ignoring invalid INFERENCE_THREADS=%r; using 1", os.getenv("INFERENCE_THREADS"))
+    INFERENCE_THREADS = 1
+
+# ANALYZER_CACHE=1 persists model outputs on disk so repeated dev/CI runs over the
+# same texts skip inference across processes; one cache file per set of models
+ANALYZER_CACHE = os.getenv("ANALYZER_CACHE") == "1"
+ANALYZER_CACHE_DIR = os.getenv(
+    "ANALYZER_CACHE_DIR", os.path.join(os.path.dirname(__file__), "..", "..", ".cache", "analyzer")
+)
+
+# Restricted categories (always blocked)
+RESTRICTED_CATEGORIES = frozenset({'weapons', 'drugs', 'adult_content', 'gambling'})
+
+class OnnxClassifier:
+    """classes_/predict_proba view of a classifier exported by train_models.py"""
+    
+    def __init__(self, path: str):
+        options = ort.SessionOptions()
+        options.intra_op_num_threads = INFERENCE_THREADS
+        self.session = ort.InferenceSession(path, options, providers=['CPUExecutionProvider'])
+        self.input_name = self.session.get_inputs()[0].name
+        meta = self.session.get_modelmeta().custom_metadata_map
+        self.classes_ = np.array(json.loads(meta['classes']))
+    
+    def predict_proba(self, X) -> np.ndarray:
+        if hasattr(X, 'toarray'):
+            X = X.toarray()
+        # Outputs are (label, probabilities); zipmap is disabled at export
+        return self.session.run(None, {self.input_name: np.asarray(X, dtype=np.float32)})[1]
+
 class TrainedModelAnalyzer:
     """Analyze content using trained models"""
     
@@ -28,18 +75,60 @@ class TrainedModelAnalyzer:
         
         # Load models
         self.category_model = self._load_model("category_classifier.pkl")
+        # Trained with n_jobs=-1; see INFERENCE_THREADS for inference
+        if hasattr(self.category_model, "n_jobs"):
+            self.category_model.n_jobs = INFERENCE_THREADS
         self.decision_model = self._load_model("decision_classifier.pkl")
-        self.text_vectorizer = self._load_model("text_vectorizer.pkl")
+        # Fitted offline; only transform() runs per request
+        self.text_vectorizer = self._load_vectorizer("text_vectorizer.pkl")
         self.category_mapping = self._load_json("category_mapping.json")
+        # Category name per column of category_model.predict_proba
+        self.category_names = [
+            self.category_mapping.get(str(int(category_id)), "unknown")
+            for category_id in self.category_model.classes_
+        ]
         
         # Load business profiles
         self.business_profiles = self._load_business_profiles()
+        # business_id -> (allowed domains as listed, lower-cased set for O(1) checks),
+        # so a request needs a single lookup; (None, None) when a profile lists no domains
+        self.business_domains = {
+            business_id: (info['domains'], frozenset(domain.lower() for domain in info['domains']))
+            if 'domains' in info else (None, None)
+            for business_id, info in self.business_profiles.items()
+        }
+        
+        # Model outputs keyed by BLAKE2b of the raw post text (LRU eviction)
+        self.cache_size = 4096
+        self._cache = OrderedDict()
+        self._cache_lock = threading.Lock()
+        self._disk_cache = self._open_disk_cache() if ANALYZER_CACHE else None
         
         logger.info("TrainedModelAnalyzer initialized successfully")
     
+    def _open_disk_cache(self):
+        """Open the persistent output cache for the models currently on disk"""
+        # Retraining changes sizes/mtimes, which switches to a fresh cache file
+        fingerprint = hashlib.blake2b(digest_size=8)
+        for name in sorted(os.listdir(self.models_dir)):
+            stat = os.stat(os.path.join(self.models_dir, name))
+            fingerprint.update(f"{name}:{stat.st_size}:{stat.st_mtime_ns};".encode())
+        
+        os.makedirs(ANALYZER_CACHE_DIR, exist_ok=True)
+        cache = shelve.open(os.path.join(ANALYZER_CACHE_DIR, fingerprint.hexdigest()))
+        atexit.register(cache.close)
+        logger.info(f"Persistent analyzer cache: {ANALYZER_CACHE_DIR}")
+        return cache
+    
     def _load_model(self, filename: str):
-        """Load pickle model"""
+        """Load pickle model, preferring an ONNX export next to it when onnxruntime is available"""
         path = os.path.join(self.models_dir, filename)
+        onnx_path = os.path.splitext(path)[0] + ".onnx"
+        if ort is not None and os.path.exists(onnx_path):
+            model = OnnxClassifier(onnx_path)
+            logger.info(f"Loaded ONNX model: {os.path.basename(onnx_path)}")
+            return model
+        
         if not os.path.exists(path):
             raise FileNotFoundError(f"Model not found: {path}. Please run train_models.py first.")
         
@@ -48,6 +137,19 @@ class TrainedModelAnalyzer:
         logger.info(f"Loaded model: {filename}")
         return model
     
+    def _load_vectorizer(self, filename: str) -> TextVectorizer:
+        """Load the frozen text vectorizer, preferring the pickle-free JSON/.npy form"""
+        path = os.path.join(self.models_dir, filename)
+        compact_path = os.path.splitext(path)[0] + ".json"
+        if os.path.exists(compact_path):
+            path = compact_path
+        if not os.path.exists(path):
+            raise FileNotFoundError(f"Model not found: {path}. Please run train_models.py first.")
+        
+        vectorizer = TextVectorizer.load(path)
+        logger.info(f"Loaded model: {os.path.basename(path)}")
+        return vectorizer
+    
     def _load_json(self, filename: str):
         """Load JSON file"""
         path = os.path.join(self.models_dir, filename)
@@ -71,6 +173,29 @@ class TrainedModelAnalyzer:
         logger.info(f"Loaded {len(data)} business profiles")
         return data
     
+    def _cache_get(self, digest: bytes):
+        with self._cache_lock:
+            entry = self._cache.get(digest)
+            if entry is not None:
+                self._cache.move_to_end(digest)
+            elif self._disk_cache is not None:
+                entry = self._disk_cache.get(digest.hex())
+                if entry is not None:
+                    self._remember(digest, entry)
+            return entry
+    
+    def _remember(self, digest: bytes, entry: Tuple):
+        """Insert into the in-memory LRU, evicting the oldest entry past cache_size; caller holds the lock"""
+        self._cache[digest] = entry
+        if len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+    
+    def _cache_put(self, digest: bytes, entry: Tuple):
+        with self._cache_lock:
+            self._remember(digest, entry)
+            if self._disk_cache is not None:
+                self._disk_cache[digest.hex()] = entry
+    
     def analyze_content(self, user_text: str, registered_domain: str, business_id: str = None) -> Dict:
         """
         Analyze content using trained models
@@ -83,146 +208,249 @@ class TrainedModelAnalyzer:
         Returns:
             Analysis result with status, reason, confidence, detected_category
         """
+        return self.analyze_batch([{
+            "user_text": user_text,
+            "registered_domain": registered_domain,
+            "business_id": business_id
+        }])[0]
+    
+    def analyze_batch(self, items: List[Dict]) -> List[Dict]:
+        """
+        Analyze several posts with one vectorizer and one model call per model
+        
+        Args:
+            items: Dicts with user_text, registered_domain and optional business_id
+        
+        Returns:
+            One analysis result per item, in order
+        """
         try:
-            # Preprocess text
-            processed_text = self.text_preprocessor.preprocess(user_text)
+            # Repeated posts (retries, duplicate drafts, re-moderation) skip
+            # preprocessing, vectorization and both models
+            digests = [
+                hashlib.blake2b((item["user_text"] or "").encode(), digest_size=16).digest()
+                for item in items
+            ]
+            probas = [self._cache_get(digest) for digest in digests]
+            misses = [i for i, entry in enumerate(probas) if entry is None]
+            
+            if misses:
+                processed_texts = self.text_preprocessor.batch_preprocess(
+                    [items[i]["user_text"] for i in misses]
+                )
+                # Posts that are empty after preprocessing never reach the models
+                rows = [row for row, text in enumerate(processed_texts) if text and text.strip()]
+                for i in misses:
+                    probas[i] = (None, None)
+                
+                if rows:
+                    # float32: the forest (and its ONNX export) casts to it anyway
+                    X = self.text_vectorizer.transform(
+                        [processed_texts[row] for row in rows], dtype=np.float32
+                    )
+                    category_proba = self.category_model.predict_proba(X)
+                    for j, row in enumerate(rows):
+                        probas[misses[row]] = (category_proba[j], None)
+                    
+                    # Restricted and unclassifiable posts are decided by category
+                    # alone, so the decision model only runs for the rest
+                    needs_decision = [
+                        j for j, idx in enumerate(category_proba.argmax(axis=1))
+                        if self.category_names[idx] != "unknown"
+                        and self.category_names[idx] not in RESTRICTED_CATEGORIES
+                    ]
+                    if needs_decision:
+                        decision_proba = self.decision_model.predict_proba(X[needs_decision])
+                        for j, decision_row in zip(needs_decision, decision_proba):
+                            probas[misses[rows[j]]] = (category_proba[j], decision_row)
+                
+                for i in misses:
+                    self._cache_put(digests[i], probas[i])
+            
+            results = [
+                self._build_result(
+                    category_row,
+                    decision_row,
+                    item["registered_domain"],
+                    item.get("business_id")
+                ) if category_row is not None else None
+                for item, (category_row, decision_row) in zip(items, probas)
+            ]
             
-            if not processed_text or processed_text.strip() == "":
-                # If text is empty after preprocessing
-                return {
+            return [
+                result if result is not None else {
                     "status": "Flagged for Manual Review",
                     "reason": "Text is too short or contains no meaningful content.",
                     "confidence_score": 0.0,
                     "detected_category": "other"
                 }
-            
-            # Vectorize text - handle single string
-            X = self.text_vectorizer.transform([processed_text])
-            
-            # Ensure we have the right shape
-            if X.shape[0] != 1:
-                X = X.reshape(1, -1)
-            
-            # Predict category
-            category_pred = self.category_model.predict(X)[0]
-            category_proba = self.category_model.predict_proba(X)[0]
-            category_confidence = float(np.max(category_proba))
-            
-            # Map category ID to name
-            detected_category = self.category_mapping.get(str(int(category_pred)), "unknown")
-            
-            # Log for debugging
+                for result in results
+            ]
+        
+        except Exception as e:
+            logger.error(f"Error analyzing content: {e}", exc_info=True)
+            return [{
+                "status": "Error",
+                "reason": f"An error occurred during analysis: {str(e)}",
+                "confidence_score": 0.0,
+                "detected_category": "error",
+                "error": str(e)
+            } for _ in items]
+    
+    def _build_result(self, category_proba: np.ndarray, decision_proba: Optional[np.ndarray],
+                      registered_domain: str, business_id: Optional[str]) -> Dict:
+        """Turn one row of model probabilities into an analysis result
+        
+        decision_proba is None when the category alone decides the post.
+        """
+        # Same as predict(), without a second pass over the models
+        category_idx = int(np.argmax(category_proba))
+        category_pred = self.category_model.classes_[category_idx]
+        category_confidence = float(category_proba[category_idx])
+        
+        # Map category ID to name
+        detected_category = self.category_names[category_idx]
+        
+        # Log for debugging (skip formatting the messages when DEBUG is off)
+        debug = logger.isEnabledFor(logging.DEBUG)
+        if debug:
             logger.debug(f"Category prediction: {category_pred} -> {detected_category}")
             logger.debug(f"Category confidence: {category_confidence:.2%}")
-            
-            # Predict decision (allowed/not allowed)
-            decision_pred = self.decision_model.predict(X)[0]
-            decision_proba = self.decision_model.predict_proba(X)[0]
-            decision_confidence = float(np.max(decision_proba))
+        
+        # Decision (allowed/not allowed)
+        decision_confidence = None
+        if decision_proba is not None:
+            decision_idx = int(np.argmax(decision_proba))
+            decision_pred = self.decision_model.classes_[decision_idx]
+            decision_confidence = float(decision_proba[decision_idx])
             
             # Log for debugging
-            logger.debug(f"Decision prediction: {decision_pred} (0=blocked, 1=allowed)")
-            logger.debug(f"Decision confidence: {decision_confidence:.2%}")
-            
-            # Check domain alignment
-            domain_match = detected_category.lower() == registered_domain.lower()
-            
-            # Check if business is allowed to post in detected category (multi-domain support)
-            is_allowed_in_business_domains = False
-            business_allowed_domains = []
-            is_registered_domain_valid = False
-            
-            if business_id and business_id in self.business_profiles:
-                business_info = self.business_profiles[business_id]
-                business_allowed_domains = business_info.get('domains', [registered_domain])
-                # For a post to be approved:
-                # 1. registered_domain must be in business's allowed domains
-                # 2. detected_category must match registered_domain
-                is_registered_domain_valid = registered_domain.lower() in [d.lower() for d in business_allowed_domains]
-                is_allowed_in_business_domains = domain_match and is_registered_domain_valid
+            if debug:
+                logger.debug(f"Decision prediction: {decision_pred} (0=blocked, 1=allowed)")
+                logger.debug(f"Decision confidence: {decision_confidence:.2%}")
+        
+        # Check domain alignment
+        registered_domain_lower = registered_domain.lower()
+        domain_match = detected_category.lower() == registered_domain_lower
+        
+        # Check if business is allowed to post in detected category (multi-domain support)
+        is_allowed_in_business_domains = False
+        business_allowed_domains = []
+        is_registered_domain_valid = False
+        
+        business_entry = self.business_domains.get(business_id) if business_id else None
+        if business_entry is not None:
+            business_allowed_domains, domain_set = business_entry
+            if business_allowed_domains is None:
+                business_allowed_domains = [registered_domain]
+            # For a post to be approved:
+            # 1. registered_domain must be in business's allowed domains
+            # 2. detected_category must match registered_domain
+            is_registered_domain_valid = domain_set is None or registered_domain_lower in domain_set
+            is_allowed_in_business_domains = domain_match and is_registered_domain_valid
+            if debug:
                 logger.debug(f"Business {business_id} allowed domains: {business_allowed_domains}")
                 logger.debug(f"Registered domain '{registered_domain}' valid for business: {is_registered_domain_valid}")
                 logger.debug(f"Detected category matches registered domain: {domain_match}")
                 logger.debug(f"Is allowed in business domains: {is_allowed_in_business_domains}")
-            else:
-                # If no business_id provided, fall back to registered_domain check
-                is_allowed_in_business_domains = domain_match
-                is_registered_domain_valid = True
-                business_allowed_domains = [registered_domain]
-            
-            # Restricted categories (should always be blocked)
-            restricted_categories = ['weapons', 'drugs', 'adult_content', 'gambling']
-            
-            # Determine status - Business domain check takes priority over decision model
-            if detected_category == "unknown":
+        else:
+            # If no business_id provided, fall back to registered_domain check
+            is_allowed_in_business_domains = domain_match
+            is_registered_domain_valid = True
+            business_allowed_domains = [registered_domain]
+        
+        # Determine status - Business domain check takes priority over decision model
+        if detected_category == "unknown":
+            status = "Flagged for Manual Review"
+            reason = "Unable to determine content category."
+            confidence_score = category_confidence
+        elif detected_category in RESTRICTED_CATEGORIES:
+            # Restricted content is ALWAYS blocked regardless of business or confidence
+            # Even with low confidence, we reject restricted categories for safety
+            status = "Rejected: Restricted Content"
+            reason = f"Content classified as '{detected_category}' which is restricted for all businesses."
+            confidence_score = category_confidence
+        elif business_id and not is_registered_domain_valid:
+            # Registered domain is not valid for this business
+            status = "Rejected: Invalid Registered Domain"
+            reason = f"Registered domain '{registered_domain}' is not allowed for business '{business_id}'. Allowed domains: {', '.join(business_allowed_domains)}."
+            confidence_score = category_confidence
+        elif is_allowed_in_business_domains:
+            # Business IS allowed to post in this category
+            # But check confidence threshold for non-restricted content
+            if category_confidence < 0.15:  # Lowered from 0.20 to 0.15 (15% threshold)
                 status = "Flagged for Manual Review"
-                reason = "Unable to determine content category."
-                confidence_score = category_confidence
-            elif detected_category in restricted_categories:
-                # Restricted content is ALWAYS blocked regardless of business or confidence
-                # Even with low confidence, we reject restricted categories for safety
-                status = "Rejected: Restricted Content"
-                reason = f"Content classified as '{detected_category}' which is restricted for all businesses."
-                confidence_score = category_confidence
-            elif business_id and not is_registered_domain_valid:
-                # Registered domain is not valid for this business
-                status = "Rejected: Invalid Registered Domain"
-                reason = f"Registered domain '{registered_domain}' is not allowed for business '{business_id}'. Allowed domains: {', '.join(business_allowed_domains)}."
-                confidence_score = category_confidence
-            elif is_allowed_in_business_domains:
-                # Business IS allowed to post in this category
-                # But check confidence threshold for non-restricted content
-                if category_confidence < 0.15:  # Lowered from 0.20 to 0.15 (15% threshold)
-                    status = "Flagged for Manual Review"
-                    if business_id:
-                        reason = f"Content detected as '{detected_category}' (allowed for business '{business_id}'), but confidence is very low ({category_confidence:.2%})."
-                    else:
-                        reason = f"Content matches domain '{registered_domain}', but confidence is very low ({category_confidence:.2%})."
-                    confidence_score = category_confidence
-                else:
-                    status = "Approved"
-                    if business_id:
-                        reason = f"Content matches allowed domain '{detected_category}' for business '{business_id}'."
-                    else:
-                        reason = f"Content matches domain '{registered_domain}'."
-                    confidence_score = category_confidence
-            elif not is_allowed_in_business_domains:
-                # Business is NOT allowed to post in this category (domain mismatch)
-                status = "Rejected: Domain Mismatch"
                 if business_id:
-                    reason = f"Content detected as '{detected_category}' but business '{business_id}' is only allowed to post in: {', '.join(business_allowed_domains)}."
+                    reason = f"Content detected as '{detected_category}' (allowed for business '{business_id}'), but confidence is very low ({category_confidence:.2%})."
                 else:
-                    reason = f"Content detected as '{detected_category}' but business registered for '{registered_domain}'."
+                    reason = f"Content matches domain '{registered_domain}', but confidence is very low ({category_confidence:.2%})."
                 confidence_score = category_confidence
             else:
-                # Fallback (shouldn't reach here)
-                status = "Flagged for Manual Review"
-                reason = "Unable to determine content allowance."
+                status = "Approved"
+                if business_id:
+                    reason = f"Content matches allowed domain '{detected_category}' for business '{business_id}'."
+                else:
+                    reason = f"Content matches domain '{registered_domain}'."
                 confidence_score = category_confidence
-            
-            return {
-                "status": status,
-                "reason": reason,
-                "confidence": round(confidence_score, 4),
-                "confidence_score": round(confidence_score, 4),
-                "predicted_category": detected_category,
-                "detected_category": detected_category,
-                "domain_match": domain_match,
-                "is_allowed_in_business_domains": is_allowed_in_business_domains,
-                "business_allowed_domains": business_allowed_domains,
-                "category_confidence": round(category_confidence, 4),
-                "decision_confidence": round(decision_confidence, 4)
-            }
+        elif not is_allowed_in_business_domains:
+            # Business is NOT allowed to post in this category (domain mismatch)
+            status = "Rejected: Domain Mismatch"
+            if business_id:
+                reason = f"Content detected as '{detected_category}' but business '{business_id}' is only allowed to post in: {', '.join(business_allowed_domains)}."
+            else:
+                reason = f"Content detected as '{detected_category}' but business registered for '{registered_domain}'."
+            confidence_score = category_confidence
+        else:
+            # Fallback (shouldn't reach here)
+            status = "Flagged for Manual Review"
+            reason = "Unable to determine content allowance."
+            confidence_score = category_confidence
         
-        except Exception as e:
-            logger.error(f"Error analyzing content: {e}", exc_info=True)
-            return {
-                "status": "Error",
-                "reason": f"An error occurred during analysis: {str(e)}",
-                "confidence_score": 0.0,
-                "detected_category": "error",
-                "error": str(e)
-            }
+        return {
+            "status": status,
+            "reason": reason,
+            "confidence": round(confidence_score, 4),
+            "confidence_score": round(confidence_score, 4),
+            "predicted_category": detected_category,
+            "detected_category": detected_category,
+            "domain_match": domain_match,
+            "is_allowed_in_business_domains": is_allowed_in_business_domains,
+            "business_allowed_domains": business_allowed_domains,
+            "category_confidence": round(category_confidence, 4),
+            "decision_confidence": round(decision_confidence, 4) if decision_confidence is not None else None
+        }
+
+
+# Process-wide analyzer; models are unpickled once per worker
+_analyzer = None
+_analyzer_lock = threading.Lock()
+
+
+def get_analyzer() -> TrainedModelAnalyzer:
+    """Return the shared TrainedModelAnalyzer, loading the models on first call"""
+    global _analyzer
+    if _analyzer is None:
+        with _analyzer_lock:
+            if _analyzer is None:
+                _analyzer = TrainedModelAnalyzer()
+    return _analyzer
+
+
+def _error_result(e: Exception) -> dict:
+    """Error response for a failure outside the analyzer's own error handling"""
+    if isinstance(e, FileNotFoundError):
+        logger.error(f"Models not trained yet: {e}")
+        reason = "Models not trained yet. Please run: python train_models.py"
+    else:
+        logger.error(f"Error in analyze_content: {e}")
+        reason = f"An error occurred: {str(e)}"
+    return {
+        "status": "Error",
+        "reason": reason,
+        "confidence_score": 0.0,
+        "detected_category": "error",
+        "error": str(e)
+    }
 
 
 def analyze_content(user_text: str, registered_domain: str, business_id: str = None) -> dict:
@@ -231,24 +459,19 @@ def analyze_content(user_text: str, registered_domain: str, business_id: str = N
     This replaces the Gemini API call
     """
     try:
-        analyzer = TrainedModelAnalyzer()
+        analyzer = get_analyzer()
         result = analyzer.analyze_content(user_text, registered_domain, business_id)
         return result
-    except FileNotFoundError as e:
-        logger.error(f"Models not trained yet: {e}")
-        return {
-            "status": "Error",
-            "reason": "Models not trained yet. Please run: python train_models.py",
-            "confidence_score": 0.0,
-            "detected_category": "error",
-            "error": str(e)
-        }
     except Exception as e:
-        logger.error(f"Error in analyze_content: {e}")
-        return {
-            "status": "Error",
-            "reason": f"An error occurred: {str(e)}",
-            "confidence_score": 0.0,
-            "detected_category": "error",
-            "error": str(e)
-        }
+        return _error_result(e)
+
+
+def analyze_contents(items: List[Dict]) -> List[dict]:
+    """
+    Batch version of analyze_content(); each item has user_text,
+    registered_domain and optional business_id
+    """
+    try:
+        return get_analyzer().analyze_batch(items)
+    except Exception as e:
+        return [_error_result(e) for _ in items]
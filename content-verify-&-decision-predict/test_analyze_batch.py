@@ -0,0 +1,62 @@
+"""Test /analyze_batch against the single-item /analyze endpoint"""
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.main import app
+
+batch_items = [
+    {
+        'name': 'Allowed: education course from B057',
+        'payload': {
+            'User_Text': 'Enroll in our advanced Python programming course with certification.',
+            'Registered_Domain': 'education',
+            'Business_ID': 'B057'
+        },
+        'expected_status': 'Approved'
+    },
+    {
+        'name': 'Domain mismatch: beauty content from B057',
+        'payload': {
+            'User_Text': 'Premium makeup services available now with discount.',
+            'Registered_Domain': 'education',
+            'Business_ID': 'B057'
+        },
+        'expected_status': 'Rejected: Domain Mismatch'
+    },
+    {
+        'name': 'Restricted: drugs',
+        'payload': {
+            'User_Text': 'Buy cheap cocaine and heroin pills',
+            'Registered_Domain': 'food'
+        },
+        'expected_status': 'Rejected: Restricted Content'
+    },
+]
+
+
+@pytest.fixture(scope='module')
+def client():
+    with TestClient(app) as client:
+        yield client
+
+
+def test_batch_matches_single_item_results(client):
+    """Each batch result equals the /analyze result for the same item, in request order"""
+    response = client.post('/analyze_batch', json={'items': [item['payload'] for item in batch_items]})
+    assert response.status_code == 200
+    results = response.json()
+    assert len(results) == len(batch_items)
+
+    for item, result in zip(batch_items, results):
+        single = client.post('/analyze', json=item['payload'])
+        assert single.status_code == 200
+        assert result == single.json(), item['name']
+        assert result['status'] == item['expected_status'], item['name']
+
+
+def test_empty_batch(client):
+    """An empty batch is accepted and returns an empty list"""
+    response = client.post('/analyze_batch', json={'items': []})
+    assert response.status_code == 200
+    assert response.json() == []
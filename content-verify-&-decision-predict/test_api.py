@@ -1,10 +1,37 @@
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util import Retry
+from concurrent.futures import ThreadPoolExecutor, as_completed
 import json
 import sys
 
+try:
+    import orjson
+
+    def dump_json(obj):
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2).decode()
+
+    load_json = orjson.loads
+except ImportError:  # optional; stdlib json otherwise
+    def dump_json(obj):
+        return json.dumps(obj, indent=2)
+
+    load_json = json.loads
+
 # URL of the FastAPI application
 url = "http://127.0.0.1:8000/analyze"
 
+# Throttled or unavailable responses are retried with backoff (honouring
+# Retry-After) instead of pacing every request with a fixed sleep
+retry = Retry(
+    total=3,
+    backoff_factor=0.5,
+    status_forcelist=[429, 502, 503, 504],
+    allowed_methods=None,  # POST /analyze is safe to repeat
+    respect_retry_after_header=True,
+    raise_on_status=False
+)
+
 # Test cases
 test_cases = [
     {
@@ -30,28 +57,43 @@ test_cases = [
     }
 ]
 
+# Keep-alive pool with one connection per test case, so all of them can be in flight at once
+session = requests.Session()
+adapter = HTTPAdapter(pool_connections=1, pool_maxsize=len(test_cases), max_retries=retry)
+session.mount("http://", adapter)
+session.mount("https://", adapter)
+
 print(f"Testing API at {url}...\n")
 
-for test in test_cases:
-    print(f"--- Running Test: {test['name']} ---")
-    print(f"Input: {json.dumps(test['payload'], indent=2)}")
-    
-    try:
-        response = requests.post(url, json=test['payload'])
+# The cases are independent, so send them concurrently and report each as it completes
+with session, ThreadPoolExecutor(max_workers=len(test_cases)) as executor:
+    futures = {
+        executor.submit(session.post, url, json=test['payload'], timeout=30): test
+        for test in test_cases
+    }
+    for future in as_completed(futures):
+        test = futures[future]
+        # Build each report in full and write it once, so it is flushed as one block
+        lines = [
+            f"--- Test: {test['name']} ---",
+            f"Input: {dump_json(test['payload'])}"
+        ]
         
-        if response.status_code == 200:
-            print("Response:")
-            print(json.dumps(response.json(), indent=2))
-        else:
-            print(f"FAILED. Status Code: {response.status_code}")
-            print(response.text)
+        try:
+            response = future.result()
+            
+            if response.status_code == 200:
+                lines.append("Response:")
+                lines.append(dump_json(load_json(response.content)))
+            else:
+                lines.append(f"FAILED. Status Code: {response.status_code}")
+                lines.append(response.text)
             
-    except requests.exceptions.ConnectionError:
-        print("ERROR: Could not connect to the server.")
-        print("Make sure the Uvicorn server is running: 'uvicorn app.main:app --reload'")
-        sys.exit(1)
+        except requests.exceptions.ConnectionError:
+            lines.append("ERROR: Could not connect to the server.")
+            lines.append("Make sure the Uvicorn server is running: 'uvicorn app.main:app --reload'")
+            sys.stdout.write("\n".join(lines) + "\n")
+            sys.exit(1)
         
-    print("Waiting 5 seconds to avoid rate limits...")
-    import time
-    time.sleep(5)
-    print("\n" + "="*50 + "\n")
+        lines.append("\n" + "="*50 + "\n")
+        sys.stdout.write("\n".join(lines) + "\n")
@@ -1,13 +1,9 @@
 """Verify user's specific test case is now fixed"""
-import sys
-import os
 
-app_path = r'd:\Internship work\maketech\maketech_content_verification\content-verify-&-decision-predict'
-sys.path.insert(0, app_path)
+from app.trained_model_analyzer import get_analyzer
 
-from app.trained_model_analyzer import TrainedModelAnalyzer
-
-analyzer = TrainedModelAnalyzer()
+# Shared module-level analyzer, so the models are loaded at most once per process
+analyzer = get_analyzer()
 
 print("="*70)
 print("VERIFYING USER'S SPECIFIC TEST CASE")
@@ -68,17 +64,20 @@ test_cases = [
 passed = 0
 failed = 0
 
-for test_case in test_cases:
-    result = analyzer.analyze_content(
-        user_text=test_case['text'],
-        registered_domain=test_case['registered_domain'],
-        business_id=test_case['business_id']
-    )
-    
+results = analyzer.analyze_batch([
+    {
+        'user_text': test_case['text'],
+        'registered_domain': test_case['registered_domain'],
+        'business_id': test_case['business_id']
+    }
+    for test_case in test_cases
+])
+
+for test_case, result in zip(test_cases, results):
     print(f"\n✓ {test_case['name']}")
     print(f"  Status: {result['status']}")
     
-    if test_case['expected'] in result['status']:
+    if result['status'] == test_case['expected']:
         print(f"  Result: PASS")
         passed += 1
     else:
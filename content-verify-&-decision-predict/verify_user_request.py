@@ -1,10 +1,6 @@
 """Verify the specific case from the user request"""
-import sys
-import os
-sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..'))
 
 from app.trained_model_analyzer import analyze_content
-import json
 
 print("="*70)
 print("VERIFYING: Your Specific Request Case")
@@ -3,7 +3,21 @@ Data module for content verification
 """
 
 from .text_preprocessor import TextPreprocessor
-from .text_vectorizer import TextVectorizer
-from .dataset_generator import DatasetGenerator
 
-__all__ = ['TextPreprocessor', 'TextVectorizer', 'DatasetGenerator']
\ No newline at end of file
+__all__ = ['TextPreprocessor', 'TextVectorizer', 'DatasetGenerator']
+
+# Submodules behind the heavier exports (sklearn, pandas)
+_LAZY_EXPORTS = {
+    'TextVectorizer': '.text_vectorizer',
+    'DatasetGenerator': '.dataset_generator',
+}
+
+
+def __getattr__(name):
+    # Importing data.text_preprocessor should not pay for sklearn/pandas; load these on demand
+    if name in _LAZY_EXPORTS:
+        from importlib import import_module
+        value = getattr(import_module(_LAZY_EXPORTS[name], __name__), name)
+        globals()[name] = value
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
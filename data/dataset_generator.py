@@ -7,6 +7,100 @@ import random
 import json
 from typing import List, Dict
 
+try:
+    import pyarrow as pa
+    import pyarrow.csv as pa_csv
+except ImportError:  # optional; pandas' CSV writer otherwise
+    pa = None
+
+# Column order of the generated dataset
+DATASET_COLUMNS = ('text', 'category', 'business_id', 'domain', 'allowed_domains', 'label', 'is_allowed')
+# Columns stored as pandas categoricals
+CATEGORICAL_COLUMNS = ('category', 'business_id', 'domain', 'allowed_domains', 'label')
+
+# 60+ highly varied templates matching real-world posts, social media, and e-commerce
+TEMPLATES = (
+    # Natural conversational style
+    "Amazing {kw1}! Perfect for {kw2} needs",
+    "Just launched our new {kw1} range",
+    "Loving our {kw1} collection! Great for {kw2}",
+    "Looking for {kw1}? We've got you covered",
+    "Our new {kw1} with {kw2} features",
+    "Fresh {kw1} delivered daily",
+    "Exclusive {kw1} with advanced {kw2}",
+
+    # Product descriptions (e-commerce style)
+    "New AI-powered {kw1} with {kw2} integration",
+    "Latest {kw1} collection with {kw2} technology",
+    "Premium {kw1} products for {kw2} enthusiasts",
+    "Designer {kw1} with trendy {kw2}",
+    "Organic {kw1} and fresh {kw2}",
+    "Smart {kw1} devices with {kw2} capabilities",
+    "Professional {kw1} equipment for {kw2}",
+
+    # Short social media posts
+    "Best {kw1} ever!",
+    "New {kw1} alert!",
+    "{kw1} for {kw2}",
+    "Check out this {kw1}",
+    "Amazing {kw1} deals",
+    "Top {kw1} picks",
+
+    # Service offerings
+    "We provide services for {kw1} in {category} industry",
+    "Premium {kw1} services available now",
+    "Get the best {kw1} and {kw2} services today",
+    "Quality {kw1} products at affordable prices",
+    "Professional {kw1} and {kw2} solutions",
+
+    # Marketing/promotional
+    "Exclusive {kw1} deals - limited time offer",
+    "New arrival: Latest {kw1} and {kw2} collection",
+    "Hot sale on {kw1} - up to 50% off",
+    "Shop now for premium {kw1} at great prices",
+    "Special offer on {kw1} and {kw2}",
+    "Book your {kw1} with {kw2} packages",
+
+    # Educational/informational
+    "Learn more about {kw1} for {category} enthusiasts",
+    "Everything you need to know about {kw1} and {kw2}",
+    "Expert guide to {kw1} and {kw2}",
+    "Understanding {kw1} for better {kw2}",
+
+    # Benefits-focused
+    "Best {kw1} solutions for your {category} needs",
+    "Transform your experience with {kw1}",
+    "Revolutionary {kw1} technology for {kw2}",
+    "Innovative {kw1} designed for {kw2} lovers",
+
+    # Real-world marketplace style
+    "Bestselling {kw1} for {kw2} enthusiasts",
+    "Delicious {kw1} and {kw2} delivered hot",
+    "Explore {kw1} options for {kw2}",
+    "Discover {kw1} and {kw2} today",
+
+    # Customer testimonial style
+    "Your trusted source for {kw1} and {kw2}",
+    "Join thousands who love our {kw1} products",
+    "Experience the difference with our {kw1}",
+    "Customer-approved {kw1} for {kw2}",
+
+    # Action-oriented
+    "Order {kw1} online now",
+    "Browse our {kw1} collection",
+    "Shop {kw1} and {kw2}",
+    "Find the perfect {kw1}",
+    "Get instant access to {kw1}",
+
+    # Feature highlights
+    "Advanced {kw1} with {kw2} features",
+    "High-quality {kw1} and {kw2}",
+    "State-of-the-art {kw1} technology",
+    "Cutting-edge {kw1} solutions",
+
+)
+
+
 class DatasetGenerator:
     """Generate synthetic dataset for training with business IDs and domains"""
     
@@ -117,6 +211,7 @@ class DatasetGenerator:
     
     def __init__(self):
         self.categories = self.ALL_CATEGORIES
+        self._keywords = {cat: tuple(kws) for cat, kws in self.categories.items()}
         self.businesses = {}
         self.business_counter = 0
     
@@ -185,96 +280,25 @@ class DatasetGenerator:
     
     def generate_text(self, category: str) -> str:
         """Generate realistic, varied text matching real-world posts"""
-        keywords = self.categories.get(category, [])
+        keywords = self._keywords.get(category)
         if not keywords:
             return f"This is a sample text about {category}"
         
         kw1 = random.choice(keywords)
         kw2 = random.choice(keywords)
-        kw3 = random.choice(keywords)
-        
-        # 60+ highly varied templates matching real-world posts, social media, and e-commerce
-        templates = [
-            # Natural conversational style
-            f"Amazing {kw1}! Perfect for {kw2} needs",
-            f"Just launched our new {kw1} range",
-            f"Loving our {kw1} collection! Great for {kw2}",
-            f"Looking for {kw1}? We've got you covered",
-            f"Our new {kw1} with {kw2} features",
-            f"Fresh {kw1} delivered daily",
-            f"Exclusive {kw1} with advanced {kw2}",
-            
-            # Product descriptions (e-commerce style)
-            f"New AI-powered {kw1} with {kw2} integration",
-            f"Latest {kw1} collection with {kw2} technology",
-            f"Premium {kw1} products for {kw2} enthusiasts",
-            f"Designer {kw1} with trendy {kw2}",
-            f"Organic {kw1} and fresh {kw2}",
-            f"Smart {kw1} devices with {kw2} capabilities",
-            f"Professional {kw1} equipment for {kw2}",
-            
-            # Short social media posts
-            f"Best {kw1} ever!",
-            f"New {kw1} alert!",
-            f"{kw1} for {kw2}",
-            f"Check out this {kw1}",
-            f"Amazing {kw1} deals",
-            f"Top {kw1} picks",
-            
-            # Service offerings
-            f"We provide services for {kw1} in {category} industry",
-            f"Premium {kw1} services available now",
-            f"Get the best {kw1} and {kw2} services today",
-            f"Quality {kw1} products at affordable prices",
-            f"Professional {kw1} and {kw2} solutions",
-            
-            # Marketing/promotional
-            f"Exclusive {kw1} deals - limited time offer",
-            f"New arrival: Latest {kw1} and {kw2} collection",
-            f"Hot sale on {kw1} - up to 50% off",
-            f"Shop now for premium {kw1} at great prices",
-            f"Special offer on {kw1} and {kw2}",
-            f"Book your {kw1} with {kw2} packages",
-            
-            # Educational/informational
-            f"Learn more about {kw1} for {category} enthusiasts",
-            f"Everything you need to know about {kw1} and {kw2}",
-            f"Expert guide to {kw1} and {kw2}",
-            f"Understanding {kw1} for better {kw2}",
-            
-            # Benefits-focused
-            f"Best {kw1} solutions for your {category} needs",
-            f"Transform your experience with {kw1}",
-            f"Revolutionary {kw1} technology for {kw2}",
-            f"Innovative {kw1} designed for {kw2} lovers",
-            
-            # Real-world marketplace style
-            f"Bestselling {kw1} for {kw2} enthusiasts",
-            f"Delicious {kw1} and {kw2} delivered hot",
-            f"Explore {kw1} options for {kw2}",
-            f"Discover {kw1} and {kw2} today",
-            
-            # Customer testimonial style
-            f"Your trusted source for {kw1} and {kw2}",
-            f"Join thousands who love our {kw1} products",
-            f"Experience the difference with our {kw1}",
-            f"Customer-approved {kw1} for {kw2}",
-            
-            # Action-oriented
-            f"Order {kw1} online now",
-            f"Browse our {kw1} collection",
-            f"Shop {kw1} and {kw2}",
-            f"Find the perfect {kw1}",
-            f"Get instant access to {kw1}",
-            
-            # Feature highlights
-            f"Advanced {kw1} with {kw2} features",
-            f"High-quality {kw1} and {kw2}",
-            f"State-of-the-art {kw1} technology",
-            f"Cutting-edge {kw1} solutions",
-        ]
+        return random.choice(TEMPLATES).format(kw1=kw1, kw2=kw2, category=category)
+    
+    def generate_batch(self, category: str, n: int) -> List[str]:
+        """Generate n texts for a category, drawing all random indices up front"""
+        keywords = self._keywords.get(category)
+        if not keywords:
+            return [f"This is a sample text about {category}"] * n
         
-        return random.choice(templates)
+        kw1s = random.choices(keywords, k=n)
+        kw2s = random.choices(keywords, k=n)
+        templates = random.choices(TEMPLATES, k=n)
+        return [t.format(kw1=kw1, kw2=kw2, category=category)
+                for t, kw1, kw2 in zip(templates, kw1s, kw2s)]
     
     def generate_dataset_with_business_ids(self, samples_per_category: int = 300) -> pd.DataFrame:
         """Generate dataset with business IDs and domain validation (domain-specific assignment)"""
@@ -289,7 +313,8 @@ class DatasetGenerator:
                     domain_to_businesses[domain] = []
                 domain_to_businesses[domain].append(business_id)
         
-        data = []
+        # Column-wise buffers; one DataFrame is built from them at the end
+        data = {column: [] for column in DATASET_COLUMNS}
         
         # Generate data for SAFE categories only - using domain-specific business assignment
         for category in self.SAFE_CATEGORIES.keys():
@@ -319,95 +344,83 @@ class DatasetGenerator:
                 raise ValueError(f"ERROR: Business {primary_business} being assigned to category {category}, "
                                 f"but {category} is NOT in allowed_domains: {allowed_domains_set}")
             
-            for _ in range(samples_per_category):
-                text = self.generate_text(category)
-                
-                # All businesses show their allowed domains (comma-separated for multi-domain)
-                allowed_str = ','.join(allowed_domains_set)
-                
-                data.append({
-                    'text': text,
-                    'category': category,
-                    'business_id': primary_business,
-                    'domain': category,
-                    'allowed_domains': allowed_str,
-                    'label': category,
-                    'is_allowed': 1  # This business is allowed to post this content
-                })
+            # All businesses show their allowed domains (comma-separated for multi-domain)
+            allowed_str = ','.join(allowed_domains_set)
+            
+            # This business is allowed to post this content
+            texts = self.generate_batch(category, samples_per_category)
+            self._add_rows(data, texts, category, primary_business, allowed_str, is_allowed=1)
+        
+        # Sorted allowed-domain string per business, joined once rather than per row
+        allowed_strs = {business_id: ','.join(sorted(binfo['domains']))
+                        for business_id, binfo in self.businesses.items()}
         
         # Generate test cases: RESTRICTED content (should always be blocked)
+        business_ids = tuple(self.businesses)
+        num_sampled = min(59, len(business_ids))
         for restricted_category in self.RESTRICTED_CATEGORIES:
             # Sample businesses across all types for restricted content
-            sample_businesses = random.sample(list(self.businesses.keys()), 
-                                           min(59, len(self.businesses)))
+            sample_businesses = random.sample(business_ids, num_sampled)
             for business_id in sample_businesses:
-                text = self.generate_text(restricted_category)
-                binfo = self.businesses[business_id]
-                allowed_str = ','.join(sorted(binfo['domains']))
-                
-                data.append({
-                    'text': text,
-                    'category': restricted_category,
-                    'business_id': business_id,
-                    'domain': restricted_category,
-                    'allowed_domains': allowed_str,
-                    'label': restricted_category,
-                    'is_allowed': 0  # Restricted content - should be blocked
-                })
+                # Restricted content - should be blocked
+                texts = [self.generate_text(restricted_category)]
+                self._add_rows(data, texts, restricted_category, business_id,
+                               allowed_strs[business_id], is_allowed=0)
         
         # Generate test cases: Cross-domain violations (business posts outside allowed domain)
+        safe_categories = frozenset(self.SAFE_CATEGORIES)
         for business_id, binfo in self.businesses.items():
-            allowed_domains = sorted(binfo['domains'])
-            not_allowed_domains = sorted(set(self.SAFE_CATEGORIES.keys()) - set(binfo['domains']))
+            allowed_str = allowed_strs[business_id]
+            not_allowed_domains = sorted(safe_categories.difference(binfo['domains']))
             
             # Generate violations where business posts in NOT allowed domains
             num_violations = 5 if binfo['type'] == 'single-domain' else 3
             for _ in range(num_violations):
                 if not_allowed_domains:
                     category = random.choice(not_allowed_domains)
-                    text = self.generate_text(category)
-                    allowed_str = ','.join(allowed_domains)
-                    
-                    data.append({
-                        'text': text,
-                        'category': category,
-                        'business_id': business_id,
-                        'domain': category,
-                        'allowed_domains': allowed_str,
-                        'label': category,
-                        'is_allowed': 0  # Cross-domain violation
-                    })
+                    # Cross-domain violation
+                    texts = [self.generate_text(category)]
+                    self._add_rows(data, texts, category, business_id, allowed_str, is_allowed=0)
         
         # Generate positive examples for multi-domain businesses across their allowed domains
         for business_id, binfo in self.businesses.items():
             if binfo['type'] in ['marketplace', 'small-marketplace', 'mega-marketplace']:
                 # Generate more samples for multi-domain businesses
                 samples_per_domain = 30 if binfo['type'] == 'mega-marketplace' else 20
-                allowed_domains = sorted(binfo['domains'])
-                allowed_str = ','.join(allowed_domains)
+                allowed_str = allowed_strs[business_id]
                 
-                for domain in allowed_domains:
-                    for _ in range(samples_per_domain):
-                        text = self.generate_text(domain)
-                        data.append({
-                            'text': text,
-                            'category': domain,
-                            'business_id': business_id,
-                            'domain': domain,
-                            'allowed_domains': allowed_str,
-                            'label': domain,
-                            'is_allowed': 1  # Multi-domain business posting in allowed domain
-                        })
+                for domain in sorted(binfo['domains']):
+                    # Multi-domain business posting in allowed domain
+                    texts = self.generate_batch(domain, samples_per_domain)
+                    self._add_rows(data, texts, domain, business_id, allowed_str, is_allowed=1)
         
-        df = pd.DataFrame(data)
+        # Label-like columns repeat a few dozen distinct values across every row
+        df = pd.DataFrame(data).astype({column: 'category' for column in CATEGORICAL_COLUMNS})
         # Shuffle the dataset
         df = df.sample(frac=1, random_state=42).reset_index(drop=True)
         
         return df
     
+    @staticmethod
+    def _add_rows(data: Dict[str, list], texts: List[str], category: str, business_id: str,
+                  allowed_str: str, is_allowed: int):
+        """Append one row per text to the column buffers"""
+        n = len(texts)
+        data['text'].extend(texts)
+        data['category'].extend([category] * n)
+        data['business_id'].extend([business_id] * n)
+        data['domain'].extend([category] * n)
+        data['allowed_domains'].extend([allowed_str] * n)
+        data['label'].extend([category] * n)
+        data['is_allowed'].extend([is_allowed] * n)
+    
     def save_dataset(self, df: pd.DataFrame, filepath: str):
         """Save dataset to CSV file"""
-        df.to_csv(filepath, index=False)
+        if pa is not None:
+            # Arrow's C++ writer; quotes string fields but reads back identically
+            pa_csv.write_csv(pa.Table.from_pandas(df, preserve_index=False), filepath)
+        else:
+            df.to_csv(filepath, index=False)
         print(f"Dataset saved to {filepath}")
         print(f"Total samples: {len(df)}")
         print(f"Categories: {df['category'].nunique()}")
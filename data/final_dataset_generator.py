@@ -9,6 +9,19 @@ import random
 # Set seed for reproducibility
 random.seed(42)
 
+TEMPLATES = (
+    "Amazing {kw1}! Perfect for {kw2} needs",
+    "Just launched our new {kw1} range",
+    "Looking for {kw1}? We've got you covered",
+    "Exclusive {kw1} deals - limited time offer",
+    "New arrival: Latest {kw1} collection",
+    "Shop now for premium {kw1} at great prices",
+    "Best {kw1} ever!",
+    "Order {kw1} online now",
+    "Premium {kw1} services available",
+    "Discover {kw1} and {kw2} today",
+)
+
 class FinalDatasetGenerator:
     def __init__(self):
         # Safe categories with keywords
@@ -59,29 +72,18 @@ class FinalDatasetGenerator:
         
         # Special case: B057 for education
         self.single_domain_businesses['B057'] = {'name': 'Education Specialist B057', 'domains': ['education']}
+        
+        # Keyword lookup used by generate_text_sample (safe categories take precedence)
+        self._keywords = {**self.restricted_categories, **self.safe_categories}
     
     def generate_text_sample(self, category):
         """Generate diverse text samples for a category"""
-        keywords = self.safe_categories.get(category, [])
-        if not keywords:
-            keywords = self.restricted_categories.get(category, ['sample'])
+        keywords = self._keywords.get(category) or ['sample']
         
         kw1 = random.choice(keywords)
         kw2 = random.choice(keywords)
         
-        templates = [
-            f"Amazing {kw1}! Perfect for {kw2} needs",
-            f"Just launched our new {kw1} range",
-            f"Looking for {kw1}? We've got you covered",
-            f"Exclusive {kw1} deals - limited time offer",
-            f"New arrival: Latest {kw1} collection",
-            f"Shop now for premium {kw1} at great prices",
-            f"Best {kw1} ever!",
-            f"Order {kw1} online now",
-            f"Premium {kw1} services available",
-            f"Discover {kw1} and {kw2} today",
-        ]
-        return random.choice(templates)
+        return random.choice(TEMPLATES).format(kw1=kw1, kw2=kw2)
     
     def generate_dataset(self, samples_per_category=150):
         """Generate comprehensive dataset"""
@@ -89,6 +91,8 @@ class FinalDatasetGenerator:
         
         # Get all businesses
         all_businesses = {**self.multi_domain_businesses, **self.single_domain_businesses}
+        # Sorted allowed-domain string per business, joined once rather than per row
+        allowed_strs = {bid: ','.join(sorted(binfo['domains'])) for bid, binfo in all_businesses.items()}
         
         print("Generating dataset with:")
         print(f"  - Multi-domain businesses: {len(self.multi_domain_businesses)}")
@@ -105,7 +109,6 @@ class FinalDatasetGenerator:
             
             for _ in range(samples_per_category):
                 business_id = random.choice(eligible_businesses)
-                binfo = all_businesses[business_id]
                 text = self.generate_text_sample(category)
                 
                 data.append({
@@ -113,7 +116,7 @@ class FinalDatasetGenerator:
                     'text': text,
                     'category': category,
                     'detected_domain': category,
-                    'allowed_domains': ','.join(sorted(binfo['domains'])),
+                    'allowed_domains': allowed_strs[business_id],
                     'is_allowed': 1
                 })
         
@@ -128,7 +131,6 @@ class FinalDatasetGenerator:
                                             min(30, len(all_businesses)))
             
             for business_id in sample_businesses:
-                binfo = all_businesses[business_id]
                 text = self.generate_text_sample(restricted_cat)
                 
                 data.append({
@@ -136,7 +138,7 @@ class FinalDatasetGenerator:
                     'text': text,
                     'category': restricted_cat,
                     'detected_domain': restricted_cat,
-                    'allowed_domains': ','.join(sorted(binfo['domains'])),
+                    'allowed_domains': allowed_strs[business_id],
                     'is_allowed': 0  # Always blocked
                 })
                 restricted_count += 1
@@ -162,7 +164,7 @@ class FinalDatasetGenerator:
                         'text': text,
                         'category': category,
                         'detected_domain': category,
-                        'allowed_domains': ','.join(sorted(allowed)),
+                        'allowed_domains': allowed_strs[business_id],
                         'is_allowed': 0  # Domain mismatch - blocked
                     })
                     mismatch_count += 1
@@ -182,7 +184,7 @@ class FinalDatasetGenerator:
                         'text': text,
                         'category': domain,
                         'detected_domain': domain,
-                        'allowed_domains': ','.join(sorted(binfo['domains'])),
+                        'allowed_domains': allowed_strs[business_id],
                         'is_allowed': 1
                     })
                     multi_count += 1
@@ -6,6 +6,10 @@ import re
 import string
 from typing import List
 
+# URLs and non-letters in one pass over lower-cased text. A URL runs to the next
+# whitespace, so blanking it instead of deleting it yields the same tokens
+CLEAN_RE = re.compile(r'https?://\S+|www\.\S+|[^a-z\s]')
+
 class TextPreprocessor:
     """Text preprocessing for NLP"""
     
@@ -31,18 +35,13 @@ class TextPreprocessor:
         # Convert to lowercase
         text = text.lower()
         
-        # Remove URLs
-        text = re.sub(r'https?://\S+|www\.\S+', '', text)
-        
-        # Remove special characters and numbers
-        text = re.sub(r'[^a-zA-Z\s]', ' ', text)
-        
-        # Remove extra whitespace
-        text = ' '.join(text.split())
+        # Remove URLs, special characters and numbers
+        text = CLEAN_RE.sub(' ', text)
         
-        # Remove stopwords
+        # Split on whitespace and remove stopwords
         words = text.split()
-        words = [word for word in words if word not in self.stop_words and len(word) > 2]
+        stop_words = self.stop_words
+        words = [word for word in words if len(word) > 2 and word not in stop_words]
         
         return ' '.join(words)
 
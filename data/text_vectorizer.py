@@ -2,6 +2,9 @@
 Text Vectorizer for Content Verification - FIXED
 """
 
+import os
+import json
+import pickle
 import numpy as np
 from sklearn.feature_extraction.text import TfidfVectorizer
 from typing import List
@@ -21,6 +24,67 @@ class TextVectorizer:
         )
         self.is_fitted = False
     
+    @classmethod
+    def load(cls, path: str) -> "TextVectorizer":
+        """Load a vectorizer fitted offline (as saved by train_models.py) for inference"""
+        if path.endswith('.json'):
+            return cls._load_compact(path)
+        
+        with open(path, 'rb') as f:
+            vectorizer = pickle.load(f)
+        
+        # Accept a bare sklearn vectorizer as well as a pickled TextVectorizer
+        if not isinstance(vectorizer, cls):
+            wrapper = cls.__new__(cls)
+            wrapper.vectorizer = vectorizer
+            wrapper.is_fitted = hasattr(vectorizer, 'vocabulary_')
+            vectorizer = wrapper
+        
+        if not vectorizer.is_fitted:
+            raise ValueError(f"Vectorizer at {path} has not been fitted")
+        return vectorizer
+    
+    @staticmethod
+    def _idf_path(path: str) -> str:
+        return os.path.splitext(path)[0] + '_idf.npy'
+    
+    @classmethod
+    def _load_compact(cls, path: str) -> "TextVectorizer":
+        """Rebuild a fitted vectorizer from save() output, without unpickling"""
+        with open(path, 'r') as f:
+            state = json.load(f)
+        
+        params = state['params']
+        params['ngram_range'] = tuple(params['ngram_range'])
+        params['dtype'] = np.dtype(params['dtype']).type
+        vectorizer = TfidfVectorizer(vocabulary=state['vocabulary'], **params)
+        # Read-only mapping, shared through the page cache by every worker
+        vectorizer.idf_ = np.load(cls._idf_path(path), mmap_mode='r')
+        
+        wrapper = cls.__new__(cls)
+        wrapper.vectorizer = vectorizer
+        wrapper.is_fitted = True
+        return wrapper
+    
+    def save(self, path: str):
+        """Save what inference needs: parameters and vocabulary as JSON, idf weights as .npy"""
+        if not self.is_fitted:
+            raise ValueError("Vectorizer must be fitted before saving")
+        
+        params = self.vectorizer.get_params()
+        if callable(params['analyzer']) or params['tokenizer'] or params['preprocessor']:
+            raise ValueError("Custom analyzer/tokenizer/preprocessor callables cannot be saved as JSON")
+        del params['vocabulary'], params['tokenizer'], params['preprocessor']
+        params['dtype'] = np.dtype(params['dtype']).name
+        
+        state = {
+            'params': params,
+            'vocabulary': {term: int(idx) for term, idx in self.vectorizer.vocabulary_.items()}
+        }
+        with open(path, 'w') as f:
+            json.dump(state, f)
+        np.save(self._idf_path(path), self.vectorizer.idf_)
+    
     def fit(self, texts: List[str]):
         """Fit the vectorizer"""
         if not texts:
@@ -30,8 +94,8 @@ class TextVectorizer:
         self.is_fitted = True
         return self
     
-    def transform(self, texts: List[str]) -> np.ndarray:
-        """Transform texts to features"""
+    def transform(self, texts: List[str], dtype=np.float64) -> np.ndarray:
+        """Transform texts to dense features of the given dtype"""
         if not self.is_fitted:
             # Try to fit with the provided texts
             if texts:
@@ -43,7 +107,8 @@ class TextVectorizer:
         if isinstance(texts, str):
             texts = [texts]
         
-        return self.vectorizer.transform(texts).toarray()
+        # Cast the sparse rows before densifying: no dense float64 intermediate
+        return self.vectorizer.transform(texts).astype(dtype, copy=False).toarray()
     
     def fit_transform(self, texts: List[str]) -> np.ndarray:
         """Fit and transform"""
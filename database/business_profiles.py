@@ -4,13 +4,14 @@ Business Profiles Database for Content Verification
 
 import json
 import os
-from typing import Dict, Optional
+from typing import Dict, Iterable, Optional
 
 class BusinessProfileDB:
     """Business profiles database"""
     
     def __init__(self, db_path: str = None):
-        self.db_path = db_path or "database/business_profiles.json"
+        # Resolved against this package, not the process working directory
+        self.db_path = db_path or os.path.join(os.path.dirname(os.path.abspath(__file__)), "business_profiles.json")
         self.profiles = self._load_profiles()
     
     def _load_profiles(self) -> Dict:
@@ -87,6 +88,11 @@ class BusinessProfileDB:
         """Get business profile by ID"""
         return self.profiles.get(business_id)
     
+    def get_profiles(self, business_ids: Iterable[str]) -> Dict[str, Dict]:
+        """Get several business profiles in one lookup; unknown IDs are omitted"""
+        profiles = self.profiles
+        return {business_id: profiles[business_id] for business_id in set(business_ids) if business_id in profiles}
+    
     def get_all_profiles(self):
         """Get all business profiles"""
         return list(self.profiles.values())
\ No newline at end of file
@@ -4,14 +4,21 @@ Inference module for content verification
 
 from .text_classifier import TextClassifier
 
-try:
-    from .image_classifier import ImageClassifier
-except ImportError:
-    ImageClassifier = None
-
 try:
     from .fusion import FusionClassifier
 except ImportError:
     FusionClassifier = None
 
-__all__ = ['TextClassifier', 'ImageClassifier', 'FusionClassifier']
\ No newline at end of file
+__all__ = ['TextClassifier', 'ImageClassifier', 'FusionClassifier']
+
+
+def __getattr__(name):
+    # The image classifier pulls in PIL (and torch on first use); import it on demand
+    if name == 'ImageClassifier':
+        try:
+            from .image_classifier import ImageClassifier
+        except ImportError:
+            ImageClassifier = None
+        globals()['ImageClassifier'] = ImageClassifier
+        return ImageClassifier
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -3,6 +3,7 @@ Fusion Classifier for Content Verification
 """
 
 import numpy as np
+from operator import itemgetter
 from typing import Dict, List
 
 class FusionClassifier:
@@ -49,17 +50,23 @@ class FusionClassifier:
             # If only images
             if not text_prediction and image_predictions:
                 # Use highest confidence image prediction
-                best_image = max(image_predictions, key=lambda x: x.get('confidence', 0))
+                best_image = max(image_predictions, key=itemgetter('confidence'))
                 return best_image
             
             # Both text and images available
             text_category = text_prediction.get('category', 'unknown')
             text_confidence = text_prediction.get('confidence', 0.0)
             
-            # Get best image prediction
-            best_image = max(image_predictions, key=lambda x: x.get('confidence', 0))
+            # Get best image prediction; confidences and restriction flags are
+            # gathered into arrays once so selection and the restriction check
+            # are single vectorized reductions
+            count = len(image_predictions)
+            image_confidences = np.fromiter(map(itemgetter('confidence'), image_predictions), dtype=np.float64, count=count)
+            image_restricted = np.fromiter((img.get('is_restricted', False) for img in image_predictions), dtype=bool, count=count)
+            best_idx = int(np.argmax(image_confidences))
+            best_image = image_predictions[best_idx]
             image_category = best_image.get('category', 'unknown')
-            image_confidence = best_image.get('confidence', 0.0)
+            image_confidence = image_confidences[best_idx]
             
             # Map categories to common ones
             mapped_text_cat = self.category_mapping.get(text_category, text_category)
@@ -80,8 +87,7 @@ class FusionClassifier:
                     final_confidence = image_confidence
             
             # Check if restricted
-            is_restricted = text_prediction.get('is_restricted', False) or \
-                           any(img.get('is_restricted', False) for img in image_predictions)
+            is_restricted = bool(text_prediction.get('is_restricted', False) or image_restricted.any())
             
             return {
                 'category': final_category,
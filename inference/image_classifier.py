@@ -2,25 +2,66 @@
 Image Classifier for Content Verification
 """
 
+import io
+import os
+import copy
+import hashlib
+import threading
+from contextlib import nullcontext
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from PIL import Image
 import numpy as np
-from typing import Dict
+from typing import Dict, List, Optional, Tuple
+
+# Shared pool for image decode + resize; PIL releases the GIL while decoding
+_preproc_pool = ThreadPoolExecutor(max_workers=os.cpu_count() or 1)
+
+def set_preprocess_threads(num_threads: int):
+    """Resize the shared preprocessing pool, e.g. in each of several inference processes"""
+    global _preproc_pool
+    old_pool, _preproc_pool = _preproc_pool, ThreadPoolExecutor(max_workers=max(1, num_threads))
+    old_pool.shutdown(wait=False)
+
+# libjpeg-turbo decoder for JPEG input when PyTurboJPEG is installed; PIL otherwise
+try:
+    from turbojpeg import TurboJPEG, TJPF_RGB
+    _jpeg = TurboJPEG()
+except (ImportError, OSError, RuntimeError):
+    _jpeg = None
 
 class ImageClassifier:
     """Image classification using neural networks"""
     
-    def __init__(self):
+    def __init__(self, model_path: Optional[str] = None, quantize: bool = True):
+        self.model = None
+        # Dynamic INT8 quantization of the loaded model when running on CPU
+        self.quantize = quantize
+        self.input_size = (224, 224)
         try:
-            import torchvision.transforms as transforms
-            self.transform = transforms.Compose([
-                transforms.Resize((224, 224)),
-                transforms.ToTensor(),
-                transforms.Normalize(mean=[0.485, 0.456, 0.406], std=[0.229, 0.224, 0.225])
-            ])
+            import torch
+            # Host side only resizes to uint8; scaling and normalization run on the device
+            self.transform = self._to_tensor
+            if torch.cuda.is_available():
+                self.device = 'cuda'
+            elif getattr(torch.backends, 'mps', None) is not None and torch.backends.mps.is_available():
+                self.device = 'mps'
+            else:
+                self.device = 'cpu'
+            # Run in FP16 on CUDA (tensor cores, half the transfer bytes); MPS and CPU stay FP32
+            self.dtype = torch.float16 if self.device == 'cuda' else torch.float32
+            self.mean = torch.tensor([0.485, 0.456, 0.406], device=self.device, dtype=self.dtype).view(1, 3, 1, 1)
+            self.std = torch.tensor([0.229, 0.224, 0.225], device=self.device, dtype=self.dtype).view(1, 3, 1, 1)
             self.torch_available = True
         except (ImportError, OSError, RuntimeError):
             self.torch_available = False
             self.transform = None
+            self.device = 'cpu'
+        
+        if model_path and self.torch_available:
+            import torch
+            # Full pickled nn.Module producing one logit per entry of self.categories
+            self.model = self._prepare_model(torch.load(model_path, map_location=self.device, weights_only=False))
         
         self.categories = [
             'food', 'tech', 'education', 'health', 'finance', 'fashion',
@@ -29,62 +70,272 @@ class ImageClassifier:
             'person', 'nature', 'vehicle', 'other'
         ]
         
-        self.restricted_categories = ['weapons', 'drugs', 'adult_content', 'gambling']
+        self.restricted_categories = frozenset({'weapons', 'drugs', 'adult_content', 'gambling'})
+        # Restricted flag per category index
+        self._restricted_mask = np.array([c in self.restricted_categories for c in self.categories])
+        
+        # Prediction cache keyed by SHA-256 of the image bytes (FIFO eviction)
+        self.cache_size = 1024
+        self._cache = OrderedDict()
+        self._cache_lock = threading.Lock()
+        
+        # GPU upload state: a reusable pinned staging buffer and a dedicated
+        # copy/compute stream, allocated on first use
+        self.max_batch = 32
+        self._pinned = None
+        self._stream = None
+        self._upload_done = None
+        self._gpu_lock = threading.Lock()
     
-    def predict(self, image: Image.Image) -> Dict:
-        """Predict category for image"""
-        try:
-            # Transform image
-            input_tensor = self.transform(image).unsqueeze(0)
-            
-            # Mock prediction (in real implementation, use trained model)
-            # For now, return random predictions
-            np.random.seed(hash(str(image.size)) % 10000)
-            probabilities = np.random.rand(len(self.categories))
-            probabilities = probabilities / probabilities.sum()
-            
-            predicted_idx = np.argmax(probabilities)
-            confidence = probabilities[predicted_idx]
-            
-            predicted_category = self.categories[predicted_idx]
-            
-            # Get top categories
-            top_indices = np.argsort(probabilities)[-3:][::-1]
-            top_categories = [
-                (self.categories[idx], float(probabilities[idx]))
-                for idx in top_indices
-            ]
-            
-            # Check if restricted
-            is_restricted = predicted_category in self.restricted_categories
-            
-            return {
-                'category': predicted_category,
-                'confidence': float(confidence),
-                'is_restricted': is_restricted,
-                'top_categories': top_categories,
-                'image_size': image.size
+    def _staging_buffer(self, batch_size: int):
+        """Return a pinned host buffer with room for batch_size images, (re)allocating if needed"""
+        import torch
+        
+        if self._pinned is None or self._pinned.shape[0] < batch_size:
+            capacity = max(self.max_batch, batch_size)
+            self._pinned = torch.empty((capacity, 3, *self.input_size), dtype=torch.uint8, pin_memory=True)
+            self._stream = self._stream or torch.cuda.Stream()
+            self._upload_done = None
+        elif self._upload_done is not None:
+            # The previous upload may still be reading from the buffer
+            self._upload_done.synchronize()
+        return self._pinned[:batch_size]
+    
+    def _prepare_model(self, model):
+        """Put a loaded network in inference mode and compile its forward pass"""
+        import torch
+        
+        model = model.eval().to(self.device, dtype=self.dtype)
+        if self.device == 'cpu' and self.quantize:
+            # INT8 weights for the Linear layers (dynamic quantization has no Conv2d kernels)
+            model = torch.ao.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+        if hasattr(torch, 'compile'):
+            # CUDA graphs ("reduce-overhead") only pay off on GPU
+            compiled = torch.compile(model, mode='reduce-overhead' if self.device == 'cuda' else 'default')
+            try:
+                # Warm up so the one-time compile cost is paid here, not on the first request
+                with torch.inference_mode():
+                    compiled(torch.zeros((1, 3, *self.input_size), device=self.device, dtype=self.dtype))
+                model = compiled
+            except Exception:
+                pass  # keep the eager model if the backend cannot compile it
+        return model
+    
+    def _to_tensor(self, image: Image.Image):
+        """Resize one image to the model input size as a uint8 CHW tensor"""
+        import torch
+        
+        resized = image.convert('RGB').resize(self.input_size, Image.BILINEAR)
+        return torch.from_numpy(np.array(resized)).permute(2, 0, 1)
+    
+    def _normalize(self, input_batch):
+        """Scale a uint8 batch to [0, 1] and apply ImageNet normalization"""
+        return (input_batch.to(self.dtype) / 255 - self.mean) / self.std
+    
+    def _run_model(self, input_batch) -> np.ndarray:
+        """Run the network on a normalized device batch and return class probabilities"""
+        import torch
+        
+        # FP16 autocast on CUDA only; MPS and CPU run the model in FP32
+        autocast = torch.autocast('cuda', dtype=torch.float16) if self.device == 'cuda' else nullcontext()
+        with torch.inference_mode(), autocast:
+            logits = self.model(input_batch)
+        # Softmax in FP32 so half-precision logits cannot overflow
+        return torch.softmax(logits.float(), dim=1).cpu().numpy()
+    
+    def _forward(self, tensors: List, image_sizes: List[Tuple[int, int]]) -> np.ndarray:
+        """Run one forward pass over a batch of preprocessed images and return class probabilities"""
+        import torch
+        
+        if self.device == 'cuda':
+            # Fill the pinned staging buffer and upload/normalize on the side stream
+            # so the transfer overlaps work still queued on the default stream
+            with self._gpu_lock, torch.inference_mode():
+                staging = self._staging_buffer(len(tensors))
+                for i, tensor in enumerate(tensors):
+                    staging[i].copy_(tensor)
+                with torch.cuda.stream(self._stream), torch.autocast('cuda', dtype=torch.float16):
+                    input_batch = staging.to(self.device, non_blocking=True)
+                    self._upload_done = torch.cuda.Event()
+                    self._upload_done.record(self._stream)
+                    input_batch = self._normalize(input_batch)
+                torch.cuda.current_stream().wait_stream(self._stream)
+                if self.model is not None:
+                    return self._run_model(input_batch)
+        else:
+            with torch.inference_mode():
+                # uint8 upload (a no-op on CPU), then scale/normalize on the device
+                input_batch = self._normalize(torch.stack(tensors).to(self.device))
+            if self.model is not None:
+                return self._run_model(input_batch)
+        
+        # Mock prediction when no trained model is loaded:
+        # random predictions seeded per image
+        probabilities = np.empty((len(image_sizes), len(self.categories)))
+        for i, image_size in enumerate(image_sizes):
+            np.random.seed(hash(str(image_size)) % 10000)
+            row = np.random.rand(len(self.categories))
+            probabilities[i] = row / row.sum()
+        return probabilities
+    
+    def _build_predictions(self, image_sizes: List[Tuple[int, int]], probabilities: np.ndarray) -> List[Dict]:
+        """Build the prediction dicts for a batch from its (N, num_classes) probabilities"""
+        rows = np.arange(len(probabilities))
+        predicted = probabilities.argmax(axis=1)
+        confidences = probabilities[rows, predicted]
+        is_restricted = self._restricted_mask[predicted]
+        
+        # Top 3 per row: O(C) partition, then order just those three
+        top = np.argpartition(probabilities, -3, axis=1)[:, -3:]
+        order = np.argsort(-np.take_along_axis(probabilities, top, axis=1), axis=1)
+        top = np.take_along_axis(top, order, axis=1)
+        
+        categories = self.categories
+        return [
+            {
+                'category': categories[predicted[i]],
+                'confidence': float(confidences[i]),
+                'is_restricted': bool(is_restricted[i]),
+                'top_categories': [
+                    (categories[idx], float(probabilities[i, idx]))
+                    for idx in top[i]
+                ],
+                'image_size': image_size
             }
-            
+            for i, image_size in enumerate(image_sizes)
+        ]
+    
+    def _predict_tensors(self, tensors: List, image_sizes: List[Tuple[int, int]]) -> List[Dict]:
+        """Predict categories for already preprocessed images"""
+        if not tensors:
+            return []
+        try:
+            probabilities = self._forward(tensors, image_sizes)
+            return self._build_predictions(image_sizes, probabilities)
+        
         except Exception as e:
-            return {
+            return [{
                 'category': 'error',
                 'confidence': 0.0,
                 'is_restricted': False,
                 'error': str(e)
-            }
+            } for _ in tensors]
     
-    def predict_from_path(self, image_path: str) -> Dict:
-        """Predict category from image file path"""
+    def _read_and_hash(self, image_path: str):
+        """Read an image file once and hash its bytes; runs on the preprocessing pool"""
+        try:
+            with open(image_path, 'rb') as f:
+                data = f.read()
+            return hashlib.sha256(data).hexdigest(), data, None
+        except Exception as e:
+            return None, None, e
+    
+    def _load_and_preprocess(self, data: bytes):
+        """Decode and transform one image from its bytes; runs on the preprocessing pool"""
+        try:
+            if _jpeg is not None and data[:2] == b'\xff\xd8':
+                return self._decode_jpeg(data)
+            image = Image.open(io.BytesIO(data))
+            image_size = image.size
+            # Let the JPEG decoder downscale by a power of two while decoding
+            # (no-op for other formats); the resize only has to finish the job
+            image.draft('RGB', self.input_size)
+            return image_size, self.transform(image), None
+        except Exception as e:
+            return None, None, e
+    
+    def _decode_jpeg(self, data: bytes):
+        """Decode a JPEG with libjpeg-turbo, downscaling by the largest power of two that still covers the input size"""
+        width, height = _jpeg.decode_header(data)[:2]
+        denom = next((d for d in (8, 4, 2)
+                      if width // d >= self.input_size[0] and height // d >= self.input_size[1]), 1)
+        pixels = _jpeg.decode(data, pixel_format=TJPF_RGB, scaling_factor=(1, denom))
+        return (width, height), self.transform(Image.fromarray(pixels)), None
+    
+    def _cache_get(self, digest: str):
+        with self._cache_lock:
+            return self._cache.get(digest)
+    
+    def _cache_put(self, digest: str, prediction: Dict):
+        with self._cache_lock:
+            self._cache[digest] = prediction
+            if len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+    
+    def predict(self, image: Image.Image) -> Dict:
+        """Predict category for image"""
+        return self.predict_batch([image])[0]
+    
+    def predict_batch(self, images: List[Image.Image]) -> List[Dict]:
+        """Predict categories for several images in a single forward pass"""
         try:
-            image = Image.open(image_path).convert('RGB')
-            result = self.predict(image)
-            result['image_path'] = image_path
-            return result
+            tensors = list(_preproc_pool.map(self.transform, images))
         except Exception as e:
-            return {
+            return [{
                 'category': 'error',
                 'confidence': 0.0,
                 'is_restricted': False,
                 'error': str(e)
-            }
\ No newline at end of file
+            } for _ in images]
+        return self._predict_tensors(tensors, [image.size for image in images])
+    
+    def predict_from_path(self, image_path: str) -> Dict:
+        """Predict category from image file path"""
+        return self.predict_from_paths([image_path])[0]
+    
+    def predict_from_paths(self, image_paths: List[str], missing_ok: bool = False) -> List[Optional[Dict]]:
+        """
+        Predict categories for several image files with one batched forward pass.
+        With missing_ok, files that do not exist yield None instead of an error prediction.
+        """
+        results = [None] * len(image_paths)
+        
+        # Hash file contents; cached images are answered directly and
+        # duplicate images within the batch are only run once. Decoding of a
+        # new image is queued as soon as its bytes are read, so file reads
+        # and JPEG decodes overlap on the pool
+        pending = OrderedDict()
+        for i, (digest, data, error) in enumerate(_preproc_pool.map(self._read_and_hash, image_paths)):
+            if missing_ok and isinstance(error, FileNotFoundError):
+                continue
+            if error is not None:
+                results[i] = {
+                    'category': 'error',
+                    'confidence': 0.0,
+                    'is_restricted': False,
+                    'error': str(error)
+                }
+                continue
+            cached = self._cache_get(digest)
+            if cached is not None:
+                results[i] = copy.deepcopy(cached)
+                results[i]['image_path'] = image_paths[i]
+            elif digest in pending:
+                pending[digest][1].append(i)
+            else:
+                pending[digest] = (_preproc_pool.submit(self._load_and_preprocess, data), [i])
+        
+        # Collect the decoded images, then run a single forward pass
+        tensors, image_sizes, digests = [], [], []
+        for digest, (decoded, _) in pending.items():
+            image_size, tensor, error = decoded.result()
+            if error is not None:
+                for i in pending[digest][1]:
+                    results[i] = {
+                        'category': 'error',
+                        'confidence': 0.0,
+                        'is_restricted': False,
+                        'error': str(error)
+                    }
+                continue
+            tensors.append(tensor)
+            image_sizes.append(image_size)
+            digests.append(digest)
+        
+        for digest, prediction in zip(digests, self._predict_tensors(tensors, image_sizes)):
+            if prediction['category'] != 'error':
+                self._cache_put(digest, prediction)
+            for i in pending[digest][1]:
+                results[i] = copy.deepcopy(prediction)
+                results[i]['image_path'] = image_paths[i]
+        return results
@@ -3,8 +3,50 @@ Complete Text Classifier for Content Verification
 """
 
 import re
+import copy
+import heapq
+from functools import lru_cache
+from operator import itemgetter
 from typing import Dict, List
 
+# Common English stop words dropped before keyword matching
+STOP_WORDS = frozenset({
+    'the', 'a', 'an', 'and', 'or', 'but', 'in', 'on', 'at', 
+    'to', 'for', 'of', 'with', 'by', 'is', 'are', 'was', 'were',
+    'be', 'been', 'being', 'have', 'has', 'had', 'having',
+    'do', 'does', 'did', 'doing', 'this', 'that', 'these', 'those',
+    'am', 'is', 'are', 'was', 'were', 'be', 'been', 'being',
+    'have', 'has', 'had', 'having', 'do', 'does', 'did', 'doing',
+    'will', 'would', 'should', 'could', 'might', 'must', 'can',
+    'may', 'shall', 'ought', 'about', 'above', 'after', 'again',
+    'against', 'all', 'am', 'an', 'and', 'any', 'are', 'aren\'t',
+    'as', 'at', 'be', 'because', 'been', 'before', 'being', 'below',
+    'between', 'both', 'but', 'by', 'can\'t', 'cannot', 'could',
+    'couldn\'t', 'did', 'didn\'t', 'do', 'does', 'doesn\'t', 'doing',
+    'don\'t', 'down', 'during', 'each', 'few', 'for', 'from', 'further',
+    'had', 'hadn\'t', 'has', 'hasn\'t', 'have', 'haven\'t', 'having',
+    'he', 'he\'d', 'he\'ll', 'he\'s', 'her', 'here', 'here\'s', 'hers',
+    'herself', 'him', 'himself', 'his', 'how', 'how\'s', 'i', 'i\'d',
+    'i\'ll', 'i\'m', 'i\'ve', 'if', 'in', 'into', 'is', 'isn\'t', 'it',
+    'it\'s', 'its', 'itself', 'let\'s', 'me', 'more', 'most', 'mustn\'t',
+    'my', 'myself', 'no', 'nor', 'not', 'of', 'off', 'on', 'once',
+    'only', 'or', 'other', 'ought', 'our', 'ours', 'ourselves', 'out',
+    'over', 'own', 'same', 'shan\'t', 'she', 'she\'d', 'she\'ll', 'she\'s',
+    'should', 'shouldn\'t', 'so', 'some', 'such', 'than', 'that', 'that\'s',
+    'the', 'their', 'theirs', 'them', 'themselves', 'then', 'there',
+    'there\'s', 'these', 'they', 'they\'d', 'they\'ll', 'they\'re',
+    'they\'ve', 'this', 'those', 'through', 'to', 'too', 'under',
+    'until', 'up', 'very', 'was', 'wasn\'t', 'we', 'we\'d', 'we\'ll',
+    'we\'re', 'we\'ve', 'were', 'weren\'t', 'what', 'what\'s', 'when',
+    'when\'s', 'where', 'where\'s', 'which', 'while', 'who', 'who\'s',
+    'whom', 'why', 'why\'s', 'with', 'won\'t', 'would', 'wouldn\'t',
+    'you', 'you\'d', 'you\'ll', 'you\'re', 'you\'ve', 'your', 'yours',
+    'yourself', 'yourselves'
+})
+
+# Anything that is not a word character or whitespace
+NON_WORD_RE = re.compile(r'[^\w\s]')
+
 class TextClassifier:
     """Complete keyword-based classifier with all business domains"""
     
@@ -17,7 +59,7 @@ class TextClassifier:
             'adult_content', 'gambling', 'other'
         ]
         
-        self.restricted_categories = ['weapons', 'drugs', 'adult_content', 'gambling']
+        self.restricted_categories = frozenset({'weapons', 'drugs', 'adult_content', 'gambling'})
         
         # Complete keyword dictionary with all business domains
         self.keywords = {
@@ -181,6 +223,22 @@ class TextClassifier:
         
         # Weight multipliers
         self.weights = {'high': 3, 'medium': 2, 'low': 1}
+        
+        # Highest achievable score per category, used to normalize confidence
+        self.max_scores = {
+            category: sum(len(keywords) * self.weights[weight_level]
+                          for weight_level, keywords in levels.items())
+            for category, levels in self.keywords.items()
+        }
+        # keyword -> (category, weight level) pairs, so a text is scored in one pass over its words
+        self.keyword_index = {}
+        for category, levels in self.keywords.items():
+            for weight_level, keywords in levels.items():
+                for keyword in keywords:
+                    self.keyword_index.setdefault(keyword, []).append((category, weight_level))
+        
+        # Cache predictions per input text; predict() hands out copies
+        self._predict_cached = lru_cache(maxsize=4096)(self._predict)
     
     def preprocess_text(self, text: str) -> List[str]:
         """Preprocess text for better keyword matching"""
@@ -191,47 +249,13 @@ class TextClassifier:
         text = text.lower()
         
         # Remove special characters but keep spaces
-        text = re.sub(r'[^\w\s]', ' ', text)
+        text = NON_WORD_RE.sub(' ', text)
         
         # Split into words
         words = text.split()
         
-        # Remove common stop words
-        stop_words = {
-            'the', 'a', 'an', 'and', 'or', 'but', 'in', 'on', 'at', 
-            'to', 'for', 'of', 'with', 'by', 'is', 'are', 'was', 'were',
-            'be', 'been', 'being', 'have', 'has', 'had', 'having',
-            'do', 'does', 'did', 'doing', 'this', 'that', 'these', 'those',
-            'am', 'is', 'are', 'was', 'were', 'be', 'been', 'being',
-            'have', 'has', 'had', 'having', 'do', 'does', 'did', 'doing',
-            'will', 'would', 'should', 'could', 'might', 'must', 'can',
-            'may', 'shall', 'ought', 'about', 'above', 'after', 'again',
-            'against', 'all', 'am', 'an', 'and', 'any', 'are', 'aren\'t',
-            'as', 'at', 'be', 'because', 'been', 'before', 'being', 'below',
-            'between', 'both', 'but', 'by', 'can\'t', 'cannot', 'could',
-            'couldn\'t', 'did', 'didn\'t', 'do', 'does', 'doesn\'t', 'doing',
-            'don\'t', 'down', 'during', 'each', 'few', 'for', 'from', 'further',
-            'had', 'hadn\'t', 'has', 'hasn\'t', 'have', 'haven\'t', 'having',
-            'he', 'he\'d', 'he\'ll', 'he\'s', 'her', 'here', 'here\'s', 'hers',
-            'herself', 'him', 'himself', 'his', 'how', 'how\'s', 'i', 'i\'d',
-            'i\'ll', 'i\'m', 'i\'ve', 'if', 'in', 'into', 'is', 'isn\'t', 'it',
-            'it\'s', 'its', 'itself', 'let\'s', 'me', 'more', 'most', 'mustn\'t',
-            'my', 'myself', 'no', 'nor', 'not', 'of', 'off', 'on', 'once',
-            'only', 'or', 'other', 'ought', 'our', 'ours', 'ourselves', 'out',
-            'over', 'own', 'same', 'shan\'t', 'she', 'she\'d', 'she\'ll', 'she\'s',
-            'should', 'shouldn\'t', 'so', 'some', 'such', 'than', 'that', 'that\'s',
-            'the', 'their', 'theirs', 'them', 'themselves', 'then', 'there',
-            'there\'s', 'these', 'they', 'they\'d', 'they\'ll', 'they\'re',
-            'they\'ve', 'this', 'those', 'through', 'to', 'too', 'under',
-            'until', 'up', 'very', 'was', 'wasn\'t', 'we', 'we\'d', 'we\'ll',
-            'we\'re', 'we\'ve', 'were', 'weren\'t', 'what', 'what\'s', 'when',
-            'when\'s', 'where', 'where\'s', 'which', 'while', 'who', 'who\'s',
-            'whom', 'why', 'why\'s', 'with', 'won\'t', 'would', 'wouldn\'t',
-            'you', 'you\'d', 'you\'ll', 'you\'re', 'you\'ve', 'your', 'yours',
-            'yourself', 'yourselves'
-        }
-        
-        words = [word for word in words if word not in stop_words and len(word) > 2]
+        # Drop short tokens first (no hashing needed), then common stop words
+        words = [word for word in words if len(word) > 2 and word not in STOP_WORDS]
         
         return words
     
@@ -252,6 +276,15 @@ class TextClassifier:
     
     def predict(self, text: str) -> Dict:
         """Complete keyword-based prediction with proper confidence"""
+        return copy.deepcopy(self._predict_cached(text))
+    
+    def predict_batch(self, texts: List[str]) -> List[Dict]:
+        """Predict several texts at once; repeated texts are only scored once"""
+        unique = {text: self._predict_cached(text) for text in dict.fromkeys(texts)}
+        return [copy.deepcopy(unique[text]) for text in texts]
+    
+    def _predict(self, text: str) -> Dict:
+        """Uncached keyword-based prediction"""
         # Preprocess text
         words = self.preprocess_text(text)
         
@@ -264,12 +297,17 @@ class TextClassifier:
                 'method': 'keyword_based'
             }
         
-        # Calculate scores for each category
+        # Weight levels hit per category, looking up each distinct word once
+        hits = {}
+        for word in frozenset(words):
+            for category, weight_level in self.keyword_index.get(word, ()):
+                hits.setdefault(category, set()).add(weight_level)
+        
+        # Same totals as calculate_score(), in keyword-table order for tie-breaking
         scores = {}
-        for category in self.keywords.keys():
-            score = self.calculate_score(words, category)
-            if score > 0:
-                scores[category] = score
+        for category in self.keywords:
+            if category in hits:
+                scores[category] = sum(self.weights[level] for level in hits[category])
         
         # If no matches, return other
         if not scores:
@@ -281,13 +319,14 @@ class TextClassifier:
                 'method': 'keyword_based'
             }
         
+        # Top 3 categories by score (partial heap select, same order as a full sort)
+        ranked = heapq.nlargest(3, scores.items(), key=itemgetter(1))
+        
         # Get best category
-        best_category = max(scores.items(), key=lambda x: x[1])[0]
-        best_score = scores[best_category]
+        best_category, best_score = ranked[0]
         
         # Calculate normalized confidence (0.5 to 0.95)
-        max_possible_score = sum(len(keywords) * self.weights[weight_level] 
-                               for weight_level, keywords in self.keywords[best_category].items())
+        max_possible_score = self.max_scores[best_category]
         
         if max_possible_score > 0:
             confidence = 0.5 + (0.45 * (best_score / max_possible_score))
@@ -298,9 +337,8 @@ class TextClassifier:
         
         # Get top 3 categories with their confidence
         top_categories = []
-        for category, score in sorted(scores.items(), key=lambda x: x[1], reverse=True)[:3]:
-            max_for_cat = sum(len(keywords) * self.weights[weight_level] 
-                            for weight_level, keywords in self.keywords[category].items())
+        for category, score in ranked:
+            max_for_cat = self.max_scores[category]
             if max_for_cat > 0:
                 cat_confidence = 0.5 + (0.45 * (score / max_for_cat))
                 top_categories.append([category, min(round(cat_confidence, 2), 0.95)])
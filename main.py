@@ -6,7 +6,11 @@ Handles both text and image content verification
 import os
 import sys
 import json
+import asyncio
 import logging
+from datetime import datetime
+from functools import partial, lru_cache
+from concurrent.futures import ProcessPoolExecutor
 from fastapi import FastAPI, UploadFile, File, Form, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
 from typing import List, Optional
@@ -39,9 +43,133 @@ app.add_middleware(
 )
 
 # Initialize services
-content_api = ContentVerificationAPI()
 business_db = BusinessProfileDB()
 
+# Model inference runs in worker processes, each holding its own
+# ContentVerificationAPI (and so its own copy of the models), so requests never
+# block the event loop. Keep the count small and each worker's threads capped.
+try:
+    INFERENCE_WORKERS = int(os.getenv("INFERENCE_WORKERS", min(2, os.cpu_count() or 1)))
+except ValueError:  # malformed setting; keep the default rather than fail at import
+    logger.warning("Ignoring invalid INFERENCE_WORKERS=%r; using default", os.getenv("INFERENCE_WORKERS"))
+    INFERENCE_WORKERS = min(2, os.cpu_count() or 1)
+# Image decode/resize threads per worker process
+try:
+    WORKER_PREPROCESS_THREADS = int(os.getenv("WORKER_PREPROCESS_THREADS", 2))
+except ValueError:
+    logger.warning("Ignoring invalid WORKER_PREPROCESS_THREADS=%r; using 2", os.getenv("WORKER_PREPROCESS_THREADS"))
+    WORKER_PREPROCESS_THREADS = 2
+_worker_api = None
+
+def _init_inference_worker():
+    global _worker_api
+    try:
+        import torch
+        torch.set_num_threads(1)
+    except ImportError:
+        pass
+    from inference.image_classifier import set_preprocess_threads
+    set_preprocess_threads(WORKER_PREPROCESS_THREADS)
+    _worker_api = ContentVerificationAPI()
+
+def _call_worker_api(method: str, kwargs: dict):
+    return getattr(_worker_api, method)(**kwargs)
+
+inference_pool = ProcessPoolExecutor(max_workers=INFERENCE_WORKERS, initializer=_init_inference_worker)
+
+async def run_inference(method: str, **kwargs):
+    """Run a ContentVerificationAPI method on the inference pool"""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(inference_pool, partial(_call_worker_api, method, kwargs))
+
+@lru_cache(maxsize=None)
+def _catalog_api() -> ContentVerificationAPI:
+    """In-process API for the static category listings; its models are only built on use"""
+    return ContentVerificationAPI()
+
+@app.on_event("shutdown")
+def shutdown_inference_pool():
+    inference_pool.shutdown(wait=False, cancel_futures=True)
+
+class ImageRequestBatcher:
+    """Groups concurrent single-image requests into one batched verify_images call"""
+    
+    def __init__(self, max_batch: int, max_wait_ms: float):
+        self.max_batch = max_batch
+        self.max_wait = max_wait_ms / 1000
+        self.queue = None
+        self._collector = None
+        # The event loop only keeps weak references to tasks; hold in-flight dispatches here
+        self._tasks = set()
+    
+    async def submit(self, image_path: str, business_profile: Optional[dict] = None) -> dict:
+        if self._collector is None:
+            self.queue = asyncio.Queue()
+            self._collector = asyncio.create_task(self._collect())
+        future = asyncio.get_running_loop().create_future()
+        await self.queue.put((image_path, business_profile, future))
+        return await future
+    
+    async def _collect(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            # Wait for one request, then gather more until the batch is full or the window closes
+            items = [await self.queue.get()]
+            deadline = loop.time() + self.max_wait
+            while len(items) < self.max_batch:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    items.append(await asyncio.wait_for(self.queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+            # Dispatch without waiting so the next batch can form meanwhile
+            task = asyncio.create_task(self._dispatch(items))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+    
+    async def close(self):
+        """Stop collecting; requests still queued are failed rather than left waiting"""
+        if self._collector is None:
+            return
+        self._collector.cancel()
+        try:
+            await self._collector
+        except asyncio.CancelledError:
+            pass
+        self._collector = None
+        while not self.queue.empty():
+            _, _, future = self.queue.get_nowait()
+            if not future.done():
+                future.set_exception(RuntimeError("Image batcher is shut down"))
+    
+    async def _dispatch(self, items):
+        image_paths, business_profiles, futures = zip(*items)
+        try:
+            results = await run_inference(
+                "verify_images",
+                image_paths=list(image_paths),
+                business_profiles=list(business_profiles)
+            )
+        except Exception as e:
+            for future in futures:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        for future, result in zip(futures, results):
+            if not future.done():
+                future.set_result(result)
+
+image_batcher = ImageRequestBatcher(
+    max_batch=int(os.getenv("IMAGE_BATCH_SIZE", 16)),
+    max_wait_ms=float(os.getenv("IMAGE_BATCH_WAIT_MS", 10))
+)
+
+@app.on_event("shutdown")
+async def shutdown_image_batcher():
+    await image_batcher.close()
+
 @app.get("/")
 async def root():
     """Root endpoint"""
@@ -86,7 +214,8 @@ async def verify_text(
             business_profile = business_db.get_profile(business_id)
         
         # Verify content
-        result = content_api.verify_text(
+        result = await run_inference(
+            "verify_text",
             text=text,
             title=title,
             business_profile=business_profile
@@ -131,10 +260,7 @@ async def verify_image(
             business_profile = business_db.get_profile(business_id)
         
         # Verify content
-        result = content_api.verify_image(
-            image_path=temp_path,
-            business_profile=business_profile
-        )
+        result = await image_batcher.submit(temp_path, business_profile)
         
         # Clean up temp file
         try:
@@ -188,7 +314,8 @@ async def verify_mixed(
             business_profile = business_db.get_profile(business_id)
         
         # Verify content
-        result = content_api.verify_mixed(
+        result = await run_inference(
+            "verify_mixed",
             text=text,
             title=title,
             image_paths=temp_paths,
@@ -249,7 +376,8 @@ async def verify_for_business(
                 temp_paths.append(temp_path)
         
         # Verify content
-        result = content_api.verify_for_business(
+        result = await run_inference(
+            "verify_for_business",
             text=text,
             title=title,
             image_paths=temp_paths,
@@ -306,7 +434,7 @@ async def get_categories():
         List of categories
     """
     try:
-        categories = content_api.get_categories()
+        categories = await asyncio.to_thread(_catalog_api().get_categories)
         return {
             "success": True,
             "data": categories
@@ -325,7 +453,7 @@ async def get_restricted_categories():
         List of restricted categories
     """
     try:
-        restricted = content_api.get_restricted_categories()
+        restricted = await asyncio.to_thread(_catalog_api().get_restricted_categories)
         return {
             "success": True,
             "data": restricted
@@ -1,3 +1,11 @@
+# (label, filename keywords) checked in order; labels come out in this order
+LABEL_KEYWORDS = (
+    ("sexual", ("adult", "porn", "nsfw")),
+    ("violence", ("violence", "blood", "gore")),
+    ("hate", ("hate", "racist", "slur")),
+)
+
+
 class ImageModel:
     """Placeholder image model that inspects the image path for keywords."""
 
@@ -6,15 +14,9 @@ class ImageModel:
 
     def predict(self, image_path: str):
         # Very naive heuristic based on filename
-        labels = []
         if not image_path:
-            return {"labels": labels, "score": 0.0}
+            return {"labels": [], "score": 0.0}
         lower = image_path.lower()
-        if any(w in lower for w in ("adult", "porn", "nsfw")):
-            labels.append("sexual")
-        if any(w in lower for w in ("violence", "blood", "gore")):
-            labels.append("violence")
-        if any(w in lower for w in ("hate", "racist", "slur")):
-            labels.append("hate")
+        labels = [label for label, words in LABEL_KEYWORDS if any(w in lower for w in words)]
         score = 0.85 if labels else 0.05
         return {"labels": labels, "score": score}
@@ -1,3 +1,11 @@
+# (label, trigger words) checked in order; labels come out in this order
+LABEL_KEYWORDS = (
+    ("sexual", ("sex", "porn", "adult")),
+    ("hate", ("hate", "racist", "slur")),
+    ("violence", ("kill", "murder", "blood")),
+)
+
+
 class TextModel:
     """Very small placeholder text model using keyword matching."""
 
@@ -7,12 +15,6 @@ class TextModel:
     def predict(self, text: str):
         # returns a simple score and raw labels derived from words
         text_lower = (text or "").lower()
-        labels = []
-        if any(w in text_lower for w in ("sex", "porn", "adult")):
-            labels.append("sexual")
-        if any(w in text_lower for w in ("hate", "racist", "slur")):
-            labels.append("hate")
-        if any(w in text_lower for w in ("kill", "murder", "blood")):
-            labels.append("violence")
+        labels = [label for label, words in LABEL_KEYWORDS if any(w in text_lower for w in words)]
         score = 0.9 if labels else 0.1
         return {"labels": labels, "score": score}
@@ -7,12 +7,12 @@ import os
 import json
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'content-verify-&-decision-predict'))
 
-from app.trained_model_analyzer import TrainedModelAnalyzer
+from app.trained_model_analyzer import get_analyzer
 
 def test_enhanced_model():
     """Test the enhanced model with real Indian business scenarios"""
     
-    analyzer = TrainedModelAnalyzer()
+    analyzer = get_analyzer()
     
     # Load business profiles to get the new multi-domain IDs
     business_profiles_path = os.path.join(os.path.dirname(__file__), 'data', 'business_profiles.json')
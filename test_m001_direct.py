@@ -3,12 +3,12 @@ import sys
 import os
 
 # Set up paths properly
-app_path = r'd:\Internship work\maketech\maketech_content_verification\content-verify-&-decision-predict'
+app_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'content-verify-&-decision-predict')
 sys.path.insert(0, app_path)
 
-from app.trained_model_analyzer import TrainedModelAnalyzer
+from app.trained_model_analyzer import get_analyzer
 
-analyzer = TrainedModelAnalyzer()
+analyzer = get_analyzer()
 
 print("="*70)
 print("Testing M001 Content-Domain Mismatch")
@@ -15,13 +15,13 @@ import sys
 app_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'content-verify-&-decision-predict')
 sys.path.insert(0, app_path)
 
-from app.trained_model_analyzer import TrainedModelAnalyzer
+from app.trained_model_analyzer import get_analyzer
 
 # Load business profiles
 with open('data/business_profiles.json') as f:
     business_profiles = json.load(f)
 
-analyzer = TrainedModelAnalyzer()
+analyzer = get_analyzer()
 
 print("=" * 80)
 print("STRICT DOMAIN ENFORCEMENT TEST")
@@ -0,0 +1,14 @@
+"""Test the shared CategoryPredictor registry"""
+
+from category_prediction import get_predictor
+
+
+def test_same_config_path_returns_same_instance():
+    assert get_predictor() is get_predictor()
+    assert get_predictor('config/nonexistent.json') is get_predictor('config/nonexistent.json')
+
+
+def test_different_config_path_returns_distinct_instance():
+    default = get_predictor()
+    other = get_predictor('config/nonexistent.json')
+    assert other is not default
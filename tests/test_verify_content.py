@@ -0,0 +1,70 @@
+"""Test ContentVerificationAPI.batch_verify against per-request verify_mixed"""
+
+import os
+
+import pytest
+
+from api.verify_content import ContentVerificationAPI
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+IMAGE_PATH = os.path.join(ROOT, 'image.jpg')
+MISSING_PATH = os.path.join(ROOT, 'does_not_exist.jpg')
+
+
+@pytest.fixture(scope='module')
+def api():
+    return ContentVerificationAPI()
+
+
+def _without_timestamp(result):
+    return {key: value for key, value in result.items() if key != 'timestamp'}
+
+
+def _assert_matches_single(api, requests):
+    results = api.batch_verify(requests)
+    assert len(results) == len(requests)
+
+    for request, result in zip(requests, results):
+        single = api.verify_mixed(
+            request.get('text', ''),
+            request.get('title', ''),
+            request.get('image_paths'),
+            api.business_db.get_profile(request.get('business_id'))
+        )
+        assert 'error' not in result, result
+        assert _without_timestamp(result) == _without_timestamp(single), request
+
+
+def test_text_only_requests(api):
+    """Text-only requests match verify_mixed, with and without a business profile"""
+    _assert_matches_single(api, [
+        {'text': 'Fresh pizza delivered hot to your door', 'title': 'Pizza night'},
+        {'text': 'Buy cheap cocaine and heroin pills'},
+        {'text': 'Enroll in our Python programming course', 'business_id': 'B001'},
+    ])
+
+
+def test_missing_image_paths(api):
+    """Missing images are skipped exactly as verify_mixed skips them"""
+    _assert_matches_single(api, [
+        {'text': 'Fresh pizza delivered hot', 'image_paths': [MISSING_PATH]},
+        {'image_paths': [MISSING_PATH, IMAGE_PATH]},
+        {'image_paths': [MISSING_PATH]},
+    ])
+
+
+def test_duplicate_paths_across_requests(api):
+    """The same image in several requests yields the same per-request results"""
+    requests = [
+        {'text': 'Fresh pizza delivered hot', 'image_paths': [IMAGE_PATH]},
+        {'image_paths': [IMAGE_PATH, IMAGE_PATH]},
+        {'title': 'Gallery', 'image_paths': [IMAGE_PATH], 'business_id': 'B001'},
+    ]
+    _assert_matches_single(api, requests)
+
+    results = api.batch_verify(requests)
+    assert [r['components']['image_count'] for r in results] == [1, 2, 1]
+
+
+def test_empty_batch(api):
+    assert api.batch_verify([]) == []
@@ -4,6 +4,7 @@ Trains text and image classifiers using the generated dataset
 """
 
 import os
+import sys
 import json
 import pickle
 import pandas as pd
@@ -79,15 +80,18 @@ class ModelTrainer:
         
         return X, y, texts, category_to_id
     
-    def prepare_decision_data(self, df: pd.DataFrame):
+    def prepare_decision_data(self, df: pd.DataFrame, X=None, texts=None):
         """Prepare data for decision engine (domain alignment)"""
         logger.info("Preparing decision data...")
         
-        # Preprocess texts
-        texts = df['text'].apply(self.text_preprocessor.preprocess).tolist()
-        
-        # Vectorize texts
-        X = self.text_vectorizer.fit_transform(texts)
+        # X/texts from prepare_text_data() on the same frame are reused as is:
+        # refitting the vectorizer on identical texts gives the same matrix
+        if X is None:
+            # Preprocess texts
+            texts = df['text'].apply(self.text_preprocessor.preprocess).tolist()
+            
+            # Vectorize texts
+            X = self.text_vectorizer.fit_transform(texts)
         
         # Prepare labels (0 = not allowed, 1 = allowed)
         y = df['is_allowed'].values
@@ -133,6 +137,7 @@ class ModelTrainer:
         with open(model_path, 'wb') as f:
             pickle.dump(model, f)
         logger.info(f"Category classifier saved to {model_path}")
+        self.export_onnx(model, "category_classifier")
         
         # Save category mapping
         mapping_path = os.path.join(self.models_dir, "category_mapping.json")
@@ -177,12 +182,44 @@ class ModelTrainer:
         
         return model
     
+    def export_onnx(self, model, name: str):
+        """Export a classifier to ONNX for onnxruntime inference (needs skl2onnx)"""
+        onnx_path = os.path.join(self.models_dir, f"{name}.onnx")
+        try:
+            from skl2onnx import convert_sklearn
+            from skl2onnx.common.data_types import FloatTensorType
+        except ImportError:
+            # An export from an earlier training run would no longer match the vectorizer
+            if os.path.exists(onnx_path):
+                os.remove(onnx_path)
+            logger.info("skl2onnx not installed, skipping ONNX export")
+            return
+        
+        onx = convert_sklearn(
+            model,
+            initial_types=[('input', FloatTensorType([None, model.n_features_in_]))],
+            options={id(model): {'zipmap': False}}
+        )
+        # Keep the class labels with the graph so inference needs no pickle
+        meta = onx.metadata_props.add()
+        meta.key = 'classes'
+        meta.value = json.dumps(model.classes_.tolist())
+        
+        with open(onnx_path, 'wb') as f:
+            f.write(onx.SerializeToString())
+        logger.info(f"ONNX export saved to {onnx_path}")
+    
     def save_vectorizer(self):
         """Save the fitted vectorizer"""
         vectorizer_path = os.path.join(self.models_dir, "text_vectorizer.pkl")
         with open(vectorizer_path, 'wb') as f:
             pickle.dump(self.text_vectorizer, f)
         logger.info(f"Text vectorizer saved to {vectorizer_path}")
+        
+        # Pickle-free copy for inference (vocabulary JSON + idf .npy)
+        compact_path = os.path.join(self.models_dir, "text_vectorizer.json")
+        self.text_vectorizer.save(compact_path)
+        logger.info(f"Text vectorizer saved to {compact_path}")
     
     def train(self, dataset_path: str = None):
         """Complete training pipeline"""
@@ -198,7 +235,7 @@ class ModelTrainer:
         category_model = self.train_category_classifier(X_cat, y_cat, category_to_id)
         
         # Train decision classifier
-        X_dec, y_dec, texts_dec = self.prepare_decision_data(df)
+        X_dec, y_dec, texts_dec = self.prepare_decision_data(df, X_cat, texts_cat)
         decision_model = self.train_decision_classifier(X_dec, y_dec)
         
         # Save vectorizer
@@ -218,6 +255,11 @@ class ModelTrainer:
 if __name__ == "__main__":
     trainer = ModelTrainer()
     
-    # Train models using existing dataset
-    dataset_path = os.path.join("data", "content_verification_dataset.csv")
-    trainer.train(dataset_path)
+    if "--export-onnx" in sys.argv:
+        # Compile the already trained category classifier without retraining
+        with open(os.path.join(trainer.models_dir, "category_classifier.pkl"), 'rb') as f:
+            trainer.export_onnx(pickle.load(f), "category_classifier")
+    else:
+        # Train models using existing dataset
+        dataset_path = os.path.join("data", "content_verification_dataset.csv")
+        trainer.train(dataset_path)